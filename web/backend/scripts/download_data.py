@@ -1,13 +1,42 @@
 from skyfield.api import Loader
+from datetime import date
+import argparse
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.domain.kernel import FULL_FILENAME, SUBSET_FILENAME, write_subset
 
 def download_ephemeris():
     data_dir = os.path.join(os.path.dirname(__file__), '../src/domain/data')
     os.makedirs(data_dir, exist_ok=True)
-    print(f"Downloading de421.bsp to {data_dir}...")
+    print(f"Downloading {FULL_FILENAME} to {data_dir}...")
     load = Loader(data_dir)
-    load('de421.bsp')
+    planets = load(FULL_FILENAME)
     print("Download complete.")
+    return load, planets, data_dir
+
+def build_subset(load, planets, data_dir, start: date, end: date):
+    ts = load.timescale()
+    start_jd = ts.utc(start.year, start.month, start.day).tdb
+    end_jd = ts.utc(end.year, end.month, end.day).tdb
+    path = os.path.join(data_dir, SUBSET_FILENAME)
+    print(f"Writing {SUBSET_FILENAME} for {start} to {end}...")
+    digest = write_subset(planets, path, start_jd, end_jd)
+    full_size = os.path.getsize(planets.path)
+    print(f"Wrote {os.path.getsize(path)} bytes (full kernel: {full_size}), sha256 {digest}")
 
 if __name__ == "__main__":
-    download_ephemeris()
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Download the ephemeris and write a trimmed subset kernel.")
+    parser.add_argument("--start", type=date.fromisoformat, default=today.replace(year=today.year - 1, day=1),
+                        help="First date covered by the subset (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=today.replace(year=today.year + 10, day=1),
+                        help="Last date covered by the subset (YYYY-MM-DD)")
+    parser.add_argument("--full-only", action="store_true", help=f"Only download {FULL_FILENAME}")
+    args = parser.parse_args()
+
+    load, planets, data_dir = download_ephemeris()
+    if not args.full_only:
+        build_subset(load, planets, data_dir, args.start, args.end)
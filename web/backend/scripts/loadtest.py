@@ -0,0 +1,307 @@
+"""Load-test the WebSocket API with simulated phone clients.
+
+Each client connects to ``/ws``, reports a location near one of a few
+cities, follows a target and keeps sending GPS fixes with a little jitter,
+switching targets now and then. Afterwards the script reports update
+inter-arrival percentiles, how long the first update takes after a switch,
+and the server's CPU and memory per connection.
+
+By default a single server worker is started as a child process on a free
+local port, with the FlightRadar24 source replaced by synthetic flights so
+``AIRCRAFT_OVERHEAD`` clients can be simulated offline. ``--url`` targets a
+server that is already running instead (pass ``--pid`` to sample its CPU and
+memory), and ``--in-process`` runs the app on a thread of this process, in
+which case the resource figures include the simulated clients too.
+
+    python scripts/loadtest.py --clients 2000 --duration 60
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+CITIES = [
+    (59.91, 10.75),    # Oslo
+    (51.51, -0.13),    # London
+    (40.71, -74.01),   # New York
+    (35.68, 139.69),   # Tokyo
+    (-33.87, 151.21),  # Sydney
+]
+# Relative popularity of each target among simulated clients.
+TARGET_WEIGHTS = {
+    "SUN": 3, "MOON": 4, "MARS": 2, "VENUS": 1, "JUPITER": 2, "SATURN": 1, "AIRCRAFT_OVERHEAD": 2,
+}
+UPDATE_TYPES = ("POSITION_UPDATE", "POSITIONS_UPDATE")
+
+
+class SyntheticFlight:
+    """Stands in for a FlightRadar24 flight record."""
+
+    def __init__(self, rng: random.Random, latitude: float, longitude: float) -> None:
+        self.latitude = latitude
+        self.longitude = longitude
+        self.altitude = rng.uniform(3000, 38000)
+        self.ground_speed = rng.uniform(180, 480)
+        self.heading = rng.uniform(0, 360)
+        self.vertical_speed = rng.choice([0, 0, 0, 1200, -1200])
+        self.callsign = f"SIM{rng.randrange(10000):04d}"
+        self.id = self.callsign
+        self.origin_airport_iata = "OSL"
+        self.destination_airport_iata = "LHR"
+        self.time = time.time()
+
+
+def stub_flight_source(flights_per_tile: int = 150, delay: float = 0.2) -> None:
+    """Replace FlightRadar24 tile queries with synthetic flights spread over the tile.
+
+    `delay` seconds stand in for the upstream round trip.
+    """
+    from src.domain.aircraft_feed import AircraftFeed
+
+    def fetch_tile(self, north, south, west, east):
+        time.sleep(delay)
+        rng = random.Random()
+        return [
+            SyntheticFlight(rng, rng.uniform(south, north), rng.uniform(west, east))
+            for _ in range(flights_per_tile)
+        ]
+
+    AircraftFeed.fetch_tile = fetch_tile
+
+
+def serve(port: int, stub: bool) -> None:
+    import uvicorn
+
+    if stub:
+        stub_flight_source()
+    from src.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1.0):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+def process_usage(pid: int) -> tuple[float, int]:
+    """(CPU seconds, resident bytes) of `pid`, from /proc (Linux only)."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    return cpu, rss_kb * 1024
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+
+class Results:
+    def __init__(self) -> None:
+        self.gaps: list[float] = []
+        self.switch_latencies: list[float] = []
+        self.frames = 0
+        self.bytes = 0
+        self.connected = 0
+        self.failed = 0
+        self.dropped = 0
+
+
+async def run_client(index: int, url: str, args: argparse.Namespace, results: Results, stop_at: float) -> None:
+    import websockets
+
+    rng = random.Random(args.seed + index)
+    city_lat, city_lon = rng.choice(CITIES)
+    latitude = city_lat + rng.gauss(0, args.spread_deg)
+    longitude = city_lon + rng.gauss(0, args.spread_deg)
+    targets, weights = zip(*TARGET_WEIGHTS.items())
+    if args.no_aircraft:
+        targets, weights = targets[:-1], weights[:-1]
+
+    # Arrival time of the last update, and when the current target was requested.
+    last_arrival: Optional[float] = None
+    switched_at: Optional[float] = None
+
+    def location_message() -> str:
+        return json.dumps({"type": "UPDATE_LOCATION", "payload": {
+            "latitude": latitude, "longitude": longitude, "elevation": 10.0,
+        }})
+
+    def switch_message() -> str:
+        nonlocal last_arrival, switched_at
+        last_arrival, switched_at = None, time.monotonic()
+        target = rng.choices(targets, weights)[0]
+        return json.dumps({"type": "SWITCH_TARGET", "payload": {"target": target}})
+
+    async def receive(ws) -> None:
+        nonlocal last_arrival, switched_at
+        async for message in ws:
+            now = time.monotonic()
+            results.frames += 1
+            results.bytes += len(message)
+            if isinstance(message, str) and json.loads(message)["type"] not in UPDATE_TYPES:
+                continue
+            if switched_at is not None:
+                results.switch_latencies.append(now - switched_at)
+                switched_at = None
+            elif last_arrival is not None:
+                results.gaps.append(now - last_arrival)
+            last_arrival = now
+
+    try:
+        async with websockets.connect(url, open_timeout=60, max_size=2 ** 20) as ws:
+            results.connected += 1
+            receiver = asyncio.create_task(receive(ws))
+            await ws.send(location_message())
+            await ws.send(switch_message())
+            while time.monotonic() < stop_at and not receiver.done():
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * args.fix_interval)
+                # A walking pace of GPS drift.
+                latitude += rng.gauss(0, 1e-5)
+                longitude += rng.gauss(0, 1e-5)
+                await ws.send(location_message())
+                if rng.random() < args.fix_interval / args.switch_interval:
+                    await ws.send(switch_message())
+            if receiver.done():
+                results.dropped += 1
+            receiver.cancel()
+    except Exception:
+        results.failed += 1
+
+
+async def run_load(url: str, args: argparse.Namespace, pid: Optional[int]) -> dict:
+    results = Results()
+    baseline = process_usage(pid) if pid else None
+    started = time.monotonic()
+    stop_at = started + args.ramp + args.duration
+
+    tasks = []
+    for i in range(args.clients):
+        tasks.append(asyncio.create_task(run_client(i, url, args, results, stop_at)))
+        # Spread connections evenly over the ramp.
+        await asyncio.sleep(args.ramp / args.clients)
+
+    # Resources are sampled over the steady-state window, once everyone is connected.
+    await asyncio.sleep(max(0.0, started + args.ramp - time.monotonic()))
+    steady = process_usage(pid) if pid else None
+    steady_at = time.monotonic()
+    await asyncio.sleep(max(0.0, stop_at - time.monotonic()))
+    end = process_usage(pid) if pid else None
+    elapsed = time.monotonic() - steady_at
+    await asyncio.gather(*tasks)
+
+    report = {
+        "clients": args.clients,
+        "connected": results.connected,
+        "failed": results.failed,
+        "dropped": results.dropped,
+        "frames": results.frames,
+        "bytes": results.bytes,
+        "update_gap_p50_s": percentile(results.gaps, 50),
+        "update_gap_p99_s": percentile(results.gaps, 99),
+        "switch_latency_p50_s": percentile(results.switch_latencies, 50),
+        "switch_latency_p99_s": percentile(results.switch_latencies, 99),
+    }
+    if pid and results.connected:
+        cpu = end[0] - steady[0]
+        report["server_cpu_percent"] = 100.0 * cpu / elapsed
+        report["cpu_ms_per_connection_second"] = 1000.0 * cpu / elapsed / results.connected
+        report["memory_kb_per_connection"] = (end[1] - baseline[1]) / 1024 / results.connected
+        report["server_rss_mb"] = end[1] / 2 ** 20
+    return report
+
+
+def print_report(report: dict) -> None:
+    for key, value in report.items():
+        if isinstance(value, float):
+            value = f"{value:.4f}"
+        print(f"{key:30s} {value}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate many WebSocket clients against the backend.")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds measured after the ramp")
+    parser.add_argument("--ramp", type=float, default=10.0, help="Seconds over which clients connect")
+    parser.add_argument("--fix-interval", type=float, default=1.0, help="Mean seconds between GPS fixes")
+    parser.add_argument("--switch-interval", type=float, default=30.0, help="Mean seconds between target switches")
+    parser.add_argument("--spread-deg", type=float, default=0.05, help="Scatter of clients around each city")
+    parser.add_argument("--no-aircraft", action="store_true", help="Never pick AIRCRAFT_OVERHEAD")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="ws:// URL of a running server instead of starting one")
+    parser.add_argument("--pid", type=int, help="Process to sample CPU and memory of, with --url")
+    parser.add_argument("--in-process", action="store_true", help="Run the app on a thread of this process")
+    parser.add_argument("--real-flights", action="store_true", help="Query FlightRadar24 instead of synthetic flights")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, stub=not args.real_flights)
+        return
+
+    # Every client holds a socket; thousands exceed the usual soft limit.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    child = None
+    pid = args.pid
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f"ws://127.0.0.1:{port}/ws"
+        if args.in_process:
+            threading.Thread(target=serve, args=(port, not args.real_flights), daemon=True).start()
+            pid = os.getpid()
+        else:
+            command = [sys.executable, os.path.abspath(__file__), "--serve", str(port)]
+            if args.real_flights:
+                command.append("--real-flights")
+            child = subprocess.Popen(command, cwd=os.path.join(os.path.dirname(__file__), '..'))
+            pid = child.pid
+        wait_for_port(port)
+
+    try:
+        report = asyncio.run(run_load(url, args, pid))
+    finally:
+        if child is not None:
+            child.terminate()
+            child.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+import numpy as np
+
+from ..domain.calculator import CelestialCalculator
+from ..domain.models import CelestialBody, Direction, PositionQuery
+from .wire import JSON_ENCODER
+
+# Rows computed per vectorized pass; each chunk is streamed as soon as it is done.
+CHUNK_ROWS = 2048
+
+
+async def stream_positions(calculator: CelestialCalculator, rows: list[PositionQuery]) -> AsyncIterator[bytes]:
+    """Yield NDJSON results for `rows`, one line per row in request order.
+
+    Each line carries the row's ``index``, plus either the position fields
+    of a POSITION_UPDATE payload or an ``error``. Chunks are computed off the
+    event loop so streaming sockets keep ticking meanwhile.
+    """
+    for start in range(0, len(rows), CHUNK_ROWS):
+        yield await asyncio.to_thread(_compute_chunk, calculator, rows[start:start + CHUNK_ROWS], start)
+
+
+def _compute_chunk(calculator: CelestialCalculator, rows: list[PositionQuery], offset: int) -> bytes:
+    now = datetime.now(timezone.utc)
+    by_target: dict[str, list[int]] = {}
+    for i, row in enumerate(rows):
+        by_target.setdefault(row.target, []).append(i)
+
+    lines: list[str] = [""] * len(rows)
+    for target_id, indices in by_target.items():
+        target = _resolve_target(calculator, target_id)
+        if target is None:
+            _unsupported(lines, indices, offset, target_id)
+            continue
+
+        times = [_utc(rows[i].time) if rows[i].time else now for i in indices]
+        if isinstance(target, CelestialBody):
+            # Rows the loaded kernel cannot answer for would fail the whole group.
+            start, end = calculator.ephemeris_range
+            tdb = calculator.ts.from_datetimes(times).tdb
+            outside = [k for k, jd in enumerate(tdb) if not start <= jd <= end]
+            if outside:
+                error = f"Time is outside the ephemeris range {_date(calculator, start)} to {_date(calculator, end)}."
+                for k in outside:
+                    lines[indices[k]] = JSON_ENCODER.encode({"index": offset + indices[k], "error": error})
+                skip = set(outside)
+                indices = [i for k, i in enumerate(indices) if k not in skip]
+                times = [when for k, when in enumerate(times) if k not in skip]
+                if not indices:
+                    continue
+
+        selected = [rows[i] for i in indices]
+        result = calculator.calculate_rows(
+            [row.latitude for row in selected],
+            [row.longitude for row in selected],
+            [row.elevation for row in selected],
+            target,
+            calculator.ts.from_datetimes(times),
+        )
+        if result is None:
+            # The satellite left the catalogue in a reload since it was resolved.
+            _unsupported(lines, indices, offset, target_id)
+            continue
+        altitudes, azimuths, distances = (np.atleast_1d(values).tolist() for values in result)
+        for k, i in enumerate(indices):
+            if np.isnan(distances[k]):
+                lines[i] = JSON_ENCODER.encode({"index": offset + i, "error": "Propagation failed for this time."})
+                continue
+            payload = Direction(target_id, azimuths[k], altitudes[k], distances[k], times[k]).payload()
+            payload["index"] = offset + i
+            lines[i] = JSON_ENCODER.encode(payload)
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _unsupported(lines: list[str], indices: list[int], offset: int, target_id: str) -> None:
+    for i in indices:
+        lines[i] = JSON_ENCODER.encode({"index": offset + i, "error": f"Target '{target_id}' is not supported."})
+
+
+def _resolve_target(calculator: CelestialCalculator, target_id: str):
+    if target_id in CelestialBody.__members__:
+        return CelestialBody(target_id)
+    if calculator.satellites is not None and calculator.satellites.lookup(target_id) is not None:
+        return target_id
+    return None
+
+
+def _date(calculator: CelestialCalculator, jd: float) -> str:
+    return calculator.ts.tdb_jd(jd).utc_strftime("%Y-%m-%d")
+
+
+def _utc(time: datetime) -> datetime:
+    return time.replace(tzinfo=timezone.utc) if time.tzinfo is None else time.astimezone(timezone.utc)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Optional
+
+from ..domain.calculator import CelestialCalculator
+from ..domain.models import CelestialBody, Direction, ObserverLocation, Precision
+from ..metrics import CALCULATION_SECONDS, EXECUTOR_QUEUE_SECONDS
+
+
+class ExecutorBusy(Exception):
+    """Raised when the calculation queue is full; the caller should skip this tick."""
+
+
+# Each process-pool worker loads its own calculator once, in the initializer.
+_worker_calculator: Optional[CelestialCalculator] = None
+
+
+def _init_worker(calculator_options: dict[str, Any]) -> None:
+    global _worker_calculator
+    _worker_calculator = CelestialCalculator(**calculator_options)
+    _worker_calculator.prewarm()
+
+
+def _timed(function, submitted: float, *args) -> tuple[Any, float, float]:
+    """Run `function(*args)` on a worker; return (result, seconds queued, seconds computing).
+
+    Measured here rather than around the await, so the calculation time
+    excludes the queue. ``time.monotonic`` is system-wide, so this also
+    holds in pool processes.
+    """
+    started = time.monotonic()
+    result = function(*args)
+    return result, started - submitted, time.monotonic() - started
+
+
+def _calculate_in_worker(
+    location: ObserverLocation,
+    target: CelestialBody,
+    precision: Optional[Precision],
+    now: Optional[float],
+) -> Direction:
+    return _worker_calculator.calculate_position(location, target, precision=precision, now=now)
+
+
+def _calculate_satellite_in_worker(
+    location: ObserverLocation,
+    target: str,
+    now: Optional[float],
+) -> Optional[Direction]:
+    return _worker_calculator.calculate_satellite_position(location, target, now=now)
+
+
+def _calculate_many_in_worker(
+    location: ObserverLocation,
+    targets: list,
+    precision: Optional[Precision],
+    now: Optional[float],
+) -> list[Direction]:
+    return _worker_calculator.calculate_many(location, targets, precision=precision, now=now)
+
+
+class CalculationExecutor:
+    """Runs ephemeris calculations off the event loop.
+
+    ``kind="thread"`` shares the server's calculator (and its caches) between
+    pool threads; skyfield and NumPy release the GIL for much of the work.
+    ``kind="process"`` gives every worker process its own preloaded
+    calculator, built from `calculator_options`, for real parallelism.
+
+    At most ``workers + queue_depth`` calculations are in flight. Beyond that
+    `calculate_position` raises `ExecutorBusy` at once rather than queueing,
+    so a loaded worker drops a tick instead of falling further behind.
+
+    Every accepted calculation records its queue wait and its own run time
+    in the metrics histograms; rejected ones record nothing.
+    """
+
+    def __init__(
+        self,
+        calculator: CelestialCalculator,
+        *,
+        kind: str = "thread",
+        workers: int = 2,
+        queue_depth: int = 64,
+        calculator_options: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self._calculator = calculator
+        self.kind = kind
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.in_flight = 0
+        self.rejected = 0
+
+        self._pool: Executor
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(calculator_options or {},),
+            )
+        elif kind == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="calc")
+        else:
+            raise ValueError(f"Unknown executor kind: {kind!r}")
+
+    def start(self) -> None:
+        """Spin up every worker now so the first requests don't pay for it."""
+        if self.kind == "process":
+            # One blocking no-op per worker forces the pool to spawn them all.
+            futures = [self._pool.submit(abs, 0) for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+
+    async def calculate_position(
+        self,
+        location: ObserverLocation,
+        target: CelestialBody,
+        precision: Optional[Precision] = None,
+        now: Optional[float] = None,
+    ) -> Direction:
+        if self.kind == "process":
+            return await self._submit(_calculate_in_worker, location, target, precision, now)
+        return await self._submit(
+            lambda: self._calculator.calculate_position(location, target, precision=precision, now=now),
+        )
+
+    async def calculate_satellite_position(
+        self,
+        location: ObserverLocation,
+        target: str,
+        now: Optional[float] = None,
+    ) -> Optional[Direction]:
+        if self.kind == "process":
+            return await self._submit(_calculate_satellite_in_worker, location, target, now)
+        return await self._submit(
+            lambda: self._calculator.calculate_satellite_position(location, target, now=now),
+        )
+
+    async def calculate_many(
+        self,
+        location: ObserverLocation,
+        targets: list,
+        precision: Optional[Precision] = None,
+        now: Optional[float] = None,
+    ) -> list[Direction]:
+        if self.kind == "process":
+            return await self._submit(_calculate_many_in_worker, location, targets, precision, now)
+        return await self._submit(
+            lambda: self._calculator.calculate_many(location, targets, precision=precision, now=now),
+        )
+
+    async def _submit(self, function, *args):
+        if self.in_flight >= self.workers + self.queue_depth:
+            self.rejected += 1
+            raise ExecutorBusy()
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            result, waited, took = await loop.run_in_executor(self._pool, _timed, function, time.monotonic(), *args)
+        finally:
+            self.in_flight -= 1
+        EXECUTOR_QUEUE_SECONDS.observe(waited)
+        CALCULATION_SECONDS.observe(took)
+        return result
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,94 @@
+"""Cheap handling of inbound client messages.
+
+Phones report GPS fixes far more often than the half-second push tick can
+use. `parse_message` reads the two frequent messages, in the exact shape the
+web client sends them, without the generic JSON path; `InboundLimiter` drops
+messages beyond a per-connection rate before they are parsed at all.
+`is_location_update` sorts messages into separate buckets first, so a flood
+of fixes cannot crowd out a target switch.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Tuple
+
+# Close code for clients that keep exceeding the inbound rate.
+POLICY_VIOLATION_CLOSE_CODE = 1008
+
+_NUMBER = r"\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*"
+_LOCATION = re.compile(
+    r'\s*\{\s*"type"\s*:\s*"UPDATE_LOCATION"\s*,\s*"payload"\s*:\s*\{'
+    rf'\s*"latitude"\s*:{_NUMBER},\s*"longitude"\s*:{_NUMBER}(?:,\s*"elevation"\s*:{_NUMBER})?'
+    r'\}\s*\}\s*'
+)
+# Target names without escapes; anything else takes the JSON path.
+_SWITCH = re.compile(
+    r'\s*\{\s*"type"\s*:\s*"SWITCH_TARGET"\s*,\s*"payload"\s*:\s*\{\s*"target"\s*:\s*"([^"\\]*)"\s*\}\s*\}\s*'
+)
+
+
+def is_location_update(text: str) -> bool:
+    """Whether `text` is (or claims to be) an UPDATE_LOCATION, without parsing it."""
+    return '"UPDATE_LOCATION"' in text
+
+
+def parse_message(text: str) -> Tuple[str, Any]:
+    """Return (type, payload) of a client message.
+
+    An UPDATE_LOCATION payload comes back as a (latitude, longitude,
+    elevation) tuple of floats; other payloads as decoded JSON.
+    """
+    match = _LOCATION.fullmatch(text)
+    if match is not None:
+        latitude, longitude, elevation = match.groups()
+        return "UPDATE_LOCATION", (float(latitude), float(longitude), float(elevation) if elevation else 0.0)
+    match = _SWITCH.fullmatch(text)
+    if match is not None:
+        return "SWITCH_TARGET", {"target": match.group(1)}
+
+    message = json.loads(text)
+    kind, payload = message["type"], message.get("payload")
+    if kind == "UPDATE_LOCATION":
+        payload = (float(payload["latitude"]), float(payload["longitude"]), float(payload.get("elevation", 0.0)))
+    return kind, payload
+
+
+class InboundLimiter:
+    """Token bucket over one connection's inbound messages.
+
+    Up to `burst` messages pass at once and `rate` per second after that;
+    the rest are dropped unparsed. Drops are also counted against a budget
+    of `rate * patience` that refills at `rate` per second: a client sending
+    well over twice the rate for longer than `patience` seconds exhausts it
+    and should be disconnected.
+    """
+
+    __slots__ = ("rate", "burst", "patience", "_tokens", "_budget", "_updated", "dropped")
+
+    def __init__(self, rate: float = 20.0, burst: float = 40.0, patience: float = 10.0) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.patience = patience
+        self._tokens = burst
+        self._budget = rate * patience
+        self._updated: float | None = None
+        self.dropped = 0
+
+    def allow(self, now: float) -> bool:
+        """Take a token for a message arriving at monotonic time `now`."""
+        if self._updated is not None:
+            refill = (now - self._updated) * self.rate
+            self._tokens = min(self.burst, self._tokens + refill)
+            self._budget = min(self.rate * self.patience, self._budget + refill)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        self.dropped += 1
+        self._budget -= 1.0
+        return False
+
+    @property
+    def exhausted(self) -> bool:
+        return self._budget <= 0.0
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Optional, Tuple, Union
+
+from ..metrics import SEND_SECONDS
+
+Frame = Union[str, bytes]
+
+# "Try again later": the client is not keeping up with its own updates.
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+class Outbox:
+    """Outbound frames for one connection, sent by its own task.
+
+    Position frames go into a single latest-wins slot: only the newest
+    pointing matters, so a frame still waiting when the next one arrives is
+    replaced rather than queued. Other messages (status, errors) keep their
+    order in a short bounded queue.
+
+    Producers never wait on the socket. If the oldest unsent frame has been
+    waiting longer than `max_lag` seconds, or the message queue overflows,
+    the client is considered stuck and the connection is closed, so memory
+    and latency on the worker are not set by its slowest client.
+    """
+
+    def __init__(self, websocket: Any, *, max_lag: float = 10.0, max_messages: int = 16) -> None:
+        self._websocket = websocket
+        self.max_lag = max_lag
+        self.max_messages = max_messages
+        self._messages: deque[Tuple[Frame, float]] = deque()
+        self._position: Optional[Tuple[Frame, float]] = None
+        self._sending_since: Optional[float] = None
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent = 0
+        self.replaced = 0
+        self.latency_ms = 0.0
+        self.max_latency_ms = 0.0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def push(self, frame: Frame) -> None:
+        """Queue a position frame, replacing any position frame not yet sent."""
+        if self._stuck():
+            return
+        if self._position is not None:
+            self.replaced += 1
+        self._position = (frame, time.monotonic())
+        self._ready.set()
+
+    def put(self, frame: Frame) -> None:
+        """Queue a message that must not be replaced by later ones."""
+        if self._stuck():
+            return
+        if len(self._messages) >= self.max_messages:
+            self._disconnect("outbound queue full")
+            return
+        self._messages.append((frame, time.monotonic()))
+        self._ready.set()
+
+    def lag(self) -> float:
+        """Seconds the oldest unsent frame has been waiting."""
+        oldest = [
+            since for since in (
+                self._sending_since,
+                self._messages[0][1] if self._messages else None,
+                self._position[1] if self._position else None,
+            ) if since is not None
+        ]
+        return time.monotonic() - min(oldest) if oldest else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "sent": self.sent,
+            "replaced": self.replaced,
+            "latency_ms": round(self.latency_ms, 2),
+            "max_latency_ms": round(self.max_latency_ms, 2),
+            "lag_s": round(self.lag(), 3),
+        }
+
+    def close(self) -> None:
+        self.closed = True
+        if self._task is not None:
+            self._task.cancel()
+
+    def _stuck(self) -> bool:
+        if self.closed:
+            return True
+        if self.lag() > self.max_lag:
+            self._disconnect(f"no progress for {self.lag():.1f} s")
+            return True
+        return False
+
+    def _disconnect(self, reason: str) -> None:
+        print(f"Disconnecting slow client: {reason}")
+        self.close()
+        asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self) -> None:
+        try:
+            await self._websocket.close(code=SLOW_CLIENT_CLOSE_CODE)
+        except Exception:
+            pass
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._messages or self._position is not None:
+                    if self._messages:
+                        frame, queued = self._messages.popleft()
+                    else:
+                        frame, queued = self._position
+                        self._position = None
+
+                    self._sending_since = queued
+                    with SEND_SECONDS.time():
+                        if isinstance(frame, bytes):
+                            await self._websocket.send_bytes(frame)
+                        else:
+                            await self._websocket.send_text(frame)
+                    self._sending_since = None
+
+                    # Time from being queued to leaving the server.
+                    self.latency_ms = (time.monotonic() - queued) * 1000
+                    self.max_latency_ms = max(self.max_latency_ms, self.latency_ms)
+                    self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # The socket is gone; the receive loop cleans up the connection.
+            self.closed = True
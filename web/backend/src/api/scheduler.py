@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable, Optional
+
+TickCallback = Callable[[float], Awaitable[None]]
+
+
+class TickScheduler:
+    """A single fixed-rate timer that drives every periodic push in the worker.
+
+    Each tick takes one POSIX timestamp and starts every registered callback
+    with it, so all updates sent in a tick describe the same instant. A
+    callback still running from an earlier tick (a slow aircraft fetch, say)
+    is skipped rather than started twice. When the batch has not finished by
+    the next tick the tick counts as an overrun; missed ticks are dropped, not
+    replayed back to back.
+
+    `prepare(now)`, if given, runs synchronously at the start of every tick,
+    before any callback starts. If it raises, the error is logged and the
+    tick goes ahead.
+    """
+
+    def __init__(self, interval: float = 0.5, prepare: Optional[Callable[[float], None]] = None) -> None:
+        self.interval = interval
+        self.prepare = prepare
+        self._callbacks: dict[Hashable, TickCallback] = {}
+        self._running: dict[Hashable, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.last_duration = 0.0
+
+    def add(self, key: Hashable, callback: TickCallback) -> None:
+        """Call `callback(now)` every tick until `remove(key)`."""
+        self._callbacks[key] = callback
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def remove(self, key: Hashable) -> None:
+        self._callbacks.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._callbacks)
+
+    async def tick(self, now: float) -> None:
+        started = time.perf_counter()
+        if self.prepare is not None:
+            try:
+                self.prepare(now)
+            except Exception as exc:
+                # Like a failing callback, this must not stop the timer for everyone.
+                print(f"Tick prepare error: {exc}")
+        batch = []
+        for key, callback in list(self._callbacks.items()):
+            running = self._running.get(key)
+            if running is not None and not running.done():
+                self.skipped += 1
+                continue
+            task = asyncio.create_task(callback(now))
+            task.add_done_callback(self._report_error)
+            self._running[key] = task
+            batch.append(task)
+
+        # Forget finished work for keys that have been removed.
+        for key in [key for key, task in self._running.items() if task.done() and key not in self._callbacks]:
+            del self._running[key]
+
+        if batch:
+            _, pending = await asyncio.wait(batch, timeout=self.interval)
+            if pending:
+                self.overruns += 1
+                print(f"Tick overrun: {len(pending)} of {len(batch)} callbacks still running "
+                      f"after {self.interval * 1000:.0f} ms ({self.overruns} overruns)")
+        self.ticks += 1
+        self.last_duration = time.perf_counter() - started
+
+    @staticmethod
+    def _report_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Push error: {task.exception()}")
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        try:
+            while self._callbacks:
+                await self.tick(time.time())
+                next_tick += self.interval
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    next_tick = loop.time()
+                    delay = 0.0
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._running.values():
+            task.cancel()
+        self._running.clear()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Optional, Union
+
+from ..domain.models import Direction
+
+
+class ChangeThresholds:
+    """Shared push-suppression settings, plus counters across all connections.
+
+    An update is only sent when azimuth or altitude moved by at least
+    `angle_deg`, or distance by at least `distance_fraction` of itself, since
+    the last update sent on that connection. Every `keyframe_interval`
+    seconds one is sent regardless, so clients can tell a quiet target from a
+    dead connection. Sky objects drift about 0.004 degrees a second, so at
+    the default 0.01 degrees most half-second ticks are suppressed.
+    """
+
+    def __init__(
+        self,
+        angle_deg: float = 0.01,
+        distance_fraction: float = 1e-4,
+        keyframe_interval: float = 5.0,
+    ) -> None:
+        self.angle_deg = angle_deg
+        self.distance_fraction = distance_fraction
+        self.keyframe_interval = keyframe_interval
+        self.sent = 0
+        self.suppressed = 0
+
+    def policy(self) -> "SendPolicy":
+        return SendPolicy(self)
+
+
+class SendPolicy:
+    """Per-connection record of the last update sent, checked against `ChangeThresholds`.
+
+    A client that extrapolates from the angular rates in each update can ask
+    for a longer keyframe `interval` (see `extrapolate`). Its updates are then
+    compared with where the last one sent predicts the target to be, so a
+    steadily moving target is only re-sent at each keyframe and distance is
+    left to the keyframes.
+    """
+
+    __slots__ = ("_thresholds", "_last", "_sent_at", "interval")
+
+    def __init__(self, thresholds: ChangeThresholds) -> None:
+        self._thresholds = thresholds
+        # Keyframe interval override, set by clients that extrapolate.
+        self.interval: Optional[float] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the last update, so the next one is sent (e.g. after a target switch)."""
+        # The last update sent, by target id.
+        self._last: dict[str, Direction] = {}
+        self._sent_at: Optional[float] = None
+
+    def extrapolate(self, interval: Optional[float]) -> None:
+        """Send keyframes every `interval` seconds and suppress by prediction; None restores the default."""
+        self.interval = interval
+
+    def should_send(self, update: Union[Direction, list[Direction]], now: float) -> bool:
+        """Return True (and remember `update`) if it should go out at POSIX time `now`.
+
+        A multi-target update goes out when any one of its targets moved enough.
+        """
+        updates = update if isinstance(update, list) else (update,)
+        send = (
+            self._sent_at is None
+            or now - self._sent_at >= (self.interval or self._thresholds.keyframe_interval)
+            or len(updates) != len(self._last)
+            or any(self._moved(item, now) for item in updates)
+        )
+        if not send:
+            self._thresholds.suppressed += 1
+            return False
+
+        self._thresholds.sent += 1
+        self._last = {item.target_id: item for item in updates}
+        self._sent_at = now
+        return True
+
+    def _moved(self, update: Direction, now: float) -> bool:
+        last = self._last.get(update.target_id)
+        if last is None:
+            return True
+        azimuth, altitude = last.azimuth, last.altitude
+        thresholds = self._thresholds
+        if self.interval is not None:
+            if last.azimuth_rate is not None:
+                # Where the client has extrapolated the target to by now.
+                dt = now - self._sent_at
+                azimuth += (last.azimuth_rate + 0.5 * last.azimuth_accel * dt) * dt
+                altitude += (last.altitude_rate + 0.5 * last.altitude_accel * dt) * dt
+        elif abs(update.distance_km - last.distance_km) >= thresholds.distance_fraction * last.distance_km:
+            return True
+        return (
+            abs(update.altitude - altitude) >= thresholds.angle_deg
+            # Azimuth wraps at 360.
+            or abs((update.azimuth - azimuth + 180.0) % 360.0 - 180.0) >= thresholds.angle_deg
+        )
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, Tuple, Union
+
+from ..domain.models import Direction, ObserverLocation, Precision
+from ..domain.observer_cache import LocationKey, cell_centre, quantize_location
+from ..metrics import SERIALIZATION_SECONDS
+from .executor import ExecutorBusy
+from .outbound import Outbox
+from .send_policy import SendPolicy
+from .wire import encode_json
+
+GroupKey = Tuple[LocationKey, str, Precision]
+ComputeFn = Callable[[ObserverLocation, Any, Precision, float], Awaitable[Union[Direction, list[Direction], None]]]
+EncodeFn = Callable[[Union[Direction, list[Direction]]], Optional[bytes]]
+
+
+class SubscriptionGroup:
+    """Connections that share an observer cell, target and precision tier."""
+
+    __slots__ = ("key", "location", "target", "precision", "members")
+
+    def __init__(self, key: GroupKey, location: ObserverLocation, target: Any, precision: Precision) -> None:
+        self.key = key
+        # Cell centre, so the result does not depend on which member joined first.
+        self.location = location
+        self.target = target
+        self.precision = precision
+        self.members: set[Outbox] = set()
+
+
+class SubscriptionRegistry:
+    """Fans one computed position out to every connection in the same group.
+
+    Connections are grouped by observer cell (`precision_m` metres), target
+    (or tuple of targets) and precision. Each tick computes one `Direction` per group,
+    encodes it to JSON once and queues that same text on every member's
+    `Outbox`, so
+    compute and serialization cost grow with the number of distinct groups
+    rather than the number of sockets. 100 m moves the Moon by well under an
+    arcsecond and the ISS by under a minute of arc.
+
+    Members subscribed with a `SendPolicy` only receive the frame when it
+    passes their change thresholds. Members that negotiated the binary wire
+    format get the `encode_binary` frame instead, likewise encoded once per
+    group.
+
+    At most `concurrency` computes run at once (the executor's capacity), so
+    a tick with more groups than that waits for slots instead of having the
+    excess rejected. A group whose compute still raised `ExecutorBusy` goes
+    first on the next tick, the longest-refused first.
+    """
+
+    def __init__(
+        self,
+        compute: ComputeFn,
+        *,
+        precision_m: float = 100.0,
+        encode_binary: Optional[EncodeFn] = None,
+        concurrency: Optional[int] = None,
+    ) -> None:
+        self._compute = compute
+        self._slots = asyncio.Semaphore(concurrency) if concurrency else None
+        # Consecutive ticks each group has been refused by the executor.
+        self._starved: dict[GroupKey, int] = {}
+        self.rejected = 0
+        self._encode_binary = encode_binary
+        self.precision_m = precision_m
+        self._groups: dict[GroupKey, SubscriptionGroup] = {}
+        self._membership: dict[Outbox, GroupKey] = {}
+        self._policies: dict[Outbox, SendPolicy] = {}
+        self._binary: set[Outbox] = set()
+
+    def key(self, location: ObserverLocation, target: Any, precision: Precision) -> GroupKey:
+        return quantize_location(location, self.precision_m), str(target), precision
+
+    def subscribe(
+        self,
+        outbox: Outbox,
+        location: ObserverLocation,
+        target: Any,
+        precision: Precision,
+        policy: Optional[SendPolicy] = None,
+        binary: bool = False,
+    ) -> None:
+        """Move `outbox` into the group for its current location, target and tier."""
+        key = self.key(location, target, precision)
+        if self._membership.get(outbox) == key:
+            return
+        self.unsubscribe(outbox)
+        if policy is not None:
+            # A new group means a new target or place; send its first update at once.
+            policy.reset()
+            self._policies[outbox] = policy
+        if binary:
+            self._binary.add(outbox)
+
+        group = self._groups.get(key)
+        if group is None:
+            group = SubscriptionGroup(key, cell_centre(key[0], self.precision_m), target, precision)
+            self._groups[key] = group
+        group.members.add(outbox)
+        self._membership[outbox] = key
+
+    def unsubscribe(self, outbox: Outbox) -> None:
+        key = self._membership.pop(outbox, None)
+        self._policies.pop(outbox, None)
+        self._binary.discard(outbox)
+        if key is None:
+            return
+        group = self._groups[key]
+        group.members.discard(outbox)
+        if not group.members:
+            del self._groups[key]
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    @property
+    def connections(self) -> int:
+        return len(self._membership)
+
+    async def tick(self, now: float) -> None:
+        """Compute, encode and queue one update for every group at POSIX time `now`."""
+        # Longest-refused groups first; the sort is stable, so ties keep their order.
+        starved = self._starved
+        groups = sorted(self._groups.values(), key=lambda group: -starved.get(group.key, 0))
+        updates = await asyncio.gather(*(self._compute_group(group, now) for group in groups), return_exceptions=True)
+        self._starved = {}
+        for group, update in zip(groups, updates):
+            if isinstance(update, ExecutorBusy):
+                self.rejected += 1
+                self._starved[group.key] = starved.get(group.key, 0) + 1
+                continue
+            if isinstance(update, Exception):
+                print(f"Push error: {update}")
+                continue
+            if not update:
+                continue
+            text = frame = None
+            for outbox in group.members:
+                policy = self._policies.get(outbox)
+                if policy is not None and not policy.should_send(update, now):
+                    continue
+                if outbox in self._binary and self._encode_binary is not None:
+                    if frame is None:
+                        with SERIALIZATION_SECONDS.time():
+                            frame = self._encode_binary(update) or b""
+                    if frame:
+                        outbox.push(frame)
+                        continue
+                if text is None:
+                    with SERIALIZATION_SECONDS.time():
+                        text = encode_json(update)
+                outbox.push(text)
+
+    async def _compute_group(self, group: SubscriptionGroup, now: float):
+        if self._slots is None:
+            return await self._compute(group.location, group.target, group.precision, now)
+        async with self._slots:
+            return await self._compute(group.location, group.target, group.precision, now)
@@ -1,109 +1,376 @@
 from fastapi import WebSocket, WebSocketDisconnect
 from ..domain.calculator import CelestialCalculator
-from ..domain.models import ObserverLocation, CelestialBody, DirectionUpdate
+from ..domain.models import ObserverLocation, CelestialBody, Direction, Precision
+from ..domain.aircraft_feed import AircraftFeed
 from ..domain.aircraft_tracker import AircraftTracker
+from ..metrics import CALCULATION_SECONDS, SERIALIZATION_SECONDS, MetricsRegistry
+from .executor import CalculationExecutor
+from .inbound import POLICY_VIOLATION_CLOSE_CODE, InboundLimiter, is_location_update, parse_message
+from .outbound import Outbox
+from .scheduler import TickScheduler
+from .send_policy import ChangeThresholds
+from .subscriptions import SubscriptionRegistry
+from .wire import BINARY_SUBPROTOCOL, encode_json, encode_position, target_code
+from functools import partial
 import json
-import asyncio
+import time
 from typing import Optional
 
 AIRCRAFT_TARGET = "AIRCRAFT_OVERHEAD"
+# Upper bound on the targets of one SUBSCRIBE message.
+MAX_SUBSCRIBE_TARGETS = 32
+# Bounds on the keyframe interval an extrapolating client may ask for, seconds.
+MIN_PUSH_INTERVAL = 0.5
+MAX_PUSH_INTERVAL = 60.0
+# Per-connection budget for messages other than location fixes, which users
+# send by hand and which must not be dropped behind a flood of fixes.
+CONTROL_RATE = 2.0
+CONTROL_BURST = 10.0
 
 
 class WebSocketHandler:
-    def __init__(self, calculator: CelestialCalculator):
+    def __init__(
+        self,
+        calculator: CelestialCalculator,
+        executor: Optional[CalculationExecutor] = None,
+        thresholds: Optional[ChangeThresholds] = None,
+        max_send_lag: float = 10.0,
+        inbound_rate: float = 20.0,
+        inbound_burst: float = 40.0,
+        aircraft_feed: Optional[AircraftFeed] = None,
+    ):
         self.calculator = calculator
+        # Without an executor, calculations run inline on the event loop.
+        self.executor = executor
+        # Updates that barely moved are suppressed, apart from periodic keyframes.
+        self.thresholds = thresholds or ChangeThresholds()
         self.active_connections: list[WebSocket] = []
+        # Every frame goes through the connection's outbox; see Outbox.
+        self.outboxes: dict[WebSocket, Outbox] = {}
+        # One upstream flight source for every tracker in the worker.
+        self.aircraft_feed = aircraft_feed if aircraft_feed is not None else AircraftFeed()
+        # Trackers of connections that have selected the aircraft target.
+        self.aircraft_trackers: dict[WebSocket, AircraftTracker] = {}
+        self.max_send_lag = max_send_lag
+        # Per-connection cap on inbound messages; see InboundLimiter.
+        self.inbound_rate = inbound_rate
+        self.inbound_burst = inbound_burst
+        self.inbound_dropped = 0
+        # Location fixes received since the last tick, applied once at its start.
+        self._pending_locations: dict[WebSocket, dict] = {}
+        self.locations_coalesced = 0
+        # Celestial and satellite targets are computed once per group and broadcast.
+        self.subscriptions = SubscriptionRegistry(
+            self.compute_update,
+            encode_binary=self.encode_binary,
+            concurrency=executor.workers + executor.queue_depth if executor is not None else None,
+        )
+        # One timer for the whole worker instead of a sleep loop per socket.
+        self.scheduler = TickScheduler(interval=0.5, prepare=self.apply_pending_locations)
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+    async def connect(self, websocket: WebSocket) -> bool:
+        """Accept the socket; returns True if the client negotiated binary frames."""
+        binary = BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+        await websocket.accept(subprotocol=BINARY_SUBPROTOCOL if binary else None)
         self.active_connections.append(websocket)
+        outbox = Outbox(websocket, max_lag=self.max_send_lag)
+        outbox.start()
+        self.outboxes[websocket] = outbox
+        return binary
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
+        self.scheduler.remove(websocket)
+        self.aircraft_trackers.pop(websocket, None)
+        self._pending_locations.pop(websocket, None)
+        outbox = self.outboxes.pop(websocket, None)
+        if outbox is not None:
+            self.subscriptions.unsubscribe(outbox)
+            outbox.close()
+
+    def connection_stats(self) -> list[dict]:
+        """Send counters and latency for each open connection."""
+        return [outbox.stats() for outbox in self.outboxes.values()]
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        """Expose connection, cache, scheduler and executor state on `registry`."""
+        calculator = self.calculator
+        observers = calculator.observers
+        registry.gauge("omnicompass_connections", "Open WebSocket connections.",
+                       lambda: len(self.active_connections))
+        registry.gauge("omnicompass_aircraft_trackers", "Connections with an aircraft tracker.",
+                       lambda: len(self.aircraft_trackers))
+        registry.gauge("omnicompass_aircraft_tiles", "Map tiles with cached flights.",
+                       lambda: len(self.aircraft_feed))
+        registry.counter("omnicompass_aircraft_fetches_total", "Upstream flight queries made, one per tile.",
+                         lambda: self.aircraft_feed.fetches)
+        registry.counter("omnicompass_aircraft_fetch_failures_total", "Upstream flight queries that failed.",
+                         lambda: self.aircraft_feed.failures)
+        registry.gauge("omnicompass_subscription_groups", "Groups sharing one computed update per tick.",
+                       lambda: len(self.subscriptions))
+        registry.gauge("omnicompass_observer_cache_entries", "Observers held by the calculator's cache.",
+                       lambda: len(observers))
+        registry.gauge("omnicompass_observer_cache_hit_ratio", "Share of observer lookups served from cache.",
+                       lambda: observers.hits / max(observers.hits + observers.misses, 1))
+        if calculator.trajectories is not None:
+            trajectories = calculator.trajectories
+            registry.gauge("omnicompass_trajectory_segments", "Interpolated trajectory segments held.",
+                           lambda: len(trajectories))
+            registry.counter("omnicompass_trajectory_fits_total", "Trajectory segments fitted.",
+                             lambda: trajectories.fits)
+        registry.counter("omnicompass_updates_sent_total", "Position updates that passed the change thresholds.",
+                         lambda: self.thresholds.sent)
+        registry.counter("omnicompass_updates_suppressed_total", "Position updates suppressed as unchanged.",
+                         lambda: self.thresholds.suppressed)
+        registry.counter("omnicompass_inbound_dropped_total", "Client messages dropped by the inbound rate limit.",
+                         lambda: self.inbound_dropped)
+        registry.counter("omnicompass_locations_coalesced_total", "Location fixes replaced by a newer one before use.",
+                         lambda: self.locations_coalesced)
+        registry.counter("omnicompass_scheduler_ticks_total", "Push ticks run.",
+                         lambda: self.scheduler.ticks)
+        registry.counter("omnicompass_scheduler_overruns_total", "Push ticks that took longer than the interval.",
+                         lambda: self.scheduler.overruns)
+        registry.counter("omnicompass_scheduler_skipped_total", "Callbacks skipped while still busy from a previous tick.",
+                         lambda: self.scheduler.skipped)
+        registry.gauge("omnicompass_scheduler_last_tick_seconds", "Duration of the most recent push tick.",
+                       lambda: self.scheduler.last_duration)
+        if self.executor is not None:
+            executor = self.executor
+            registry.gauge("omnicompass_executor_in_flight", "Calculations queued or running in the executor.",
+                           lambda: executor.in_flight)
+            registry.counter("omnicompass_executor_rejected_total", "Calculations refused because the executor was full.",
+                             lambda: executor.rejected)
+        if calculator.feed is not None:
+            feed = calculator.feed
+            registry.gauge("omnicompass_snapshot_feed_connected", "1 while subscribed to the snapshot producer.",
+                           lambda: int(feed.connected))
+            registry.counter("omnicompass_snapshot_feed_frames_total", "Snapshot frames received from the producer.",
+                             lambda: feed.received)
+
+    def shutdown(self):
+        self.scheduler.stop()
+
+    def prewarm(self):
+        """Run the calculation and serialization path once before accepting traffic."""
+        self.calculator.prewarm()
+        location = ObserverLocation(latitude=0.0, longitude=0.0)
+        update = self.calculator.calculate_position(location, CelestialBody.SUN)
+        encode_json(update)
 
     async def handle_connection(self, websocket: WebSocket):
-        await self.connect(websocket)
+        binary = await self.connect(websocket)
         
         # State for this connection using a mutable container (dict) to share with closure
         state = {
             "location": None,
             "target": CelestialBody.SUN,
-            "aircraft_tracker": AircraftTracker(self.calculator),
-            "aircraft_status": "IDLE"
+            "precision": self.calculator.precision,
+            # Created on first use so celestial-only clients never pay for it.
+            "aircraft_tracker": None,
+            "aircraft_status": "IDLE",
+            "send_policy": self.thresholds.policy(),
+            "binary": binary,
+            # Latest unapplied (latitude, longitude, elevation) fix, if any.
+            "pending_location": None,
         }
-        
-        # Start a background task for pushing updates
-        push_task = asyncio.create_task(self.push_updates(websocket, state))
-        
+        # Fixes and control messages draw on separate buckets; see is_location_update.
+        location_limiter = InboundLimiter(self.inbound_rate, self.inbound_burst)
+        control_limiter = InboundLimiter(CONTROL_RATE, CONTROL_BURST)
+
         try:
             while True:
                 data = await websocket.receive_text()
-                message = json.loads(data)
-                
-                if message['type'] == 'UPDATE_LOCATION':
-                    payload = message['payload']
-                    state["location"] = ObserverLocation(
-                        latitude=payload['latitude'],
-                        longitude=payload['longitude'],
-                        elevation=payload.get('elevation', 0.0)
-                    )
-                    
-                elif message['type'] == 'SWITCH_TARGET':
-                    payload = message['payload']
+                limiter = location_limiter if is_location_update(data) else control_limiter
+                if not limiter.allow(time.monotonic()):
+                    self.inbound_dropped += 1
+                    if limiter.exhausted:
+                        print(f"Disconnecting client over the inbound rate ({limiter.dropped} dropped)")
+                        await websocket.close(code=POLICY_VIOLATION_CLOSE_CODE)
+                        self.disconnect(websocket)
+                        return
+                    continue
+                kind, payload = parse_message(data)
+
+                if kind == 'UPDATE_LOCATION':
+                    # Only the newest fix before a tick is used, so it is kept
+                    # raw and materialized once at the start of the tick.
+                    if state["pending_location"] is not None:
+                        self.locations_coalesced += 1
+                    state["pending_location"] = payload
+                    if state["location"] is None:
+                        self.apply_location(websocket, state)
+                    else:
+                        self._pending_locations[websocket] = state
+                    continue
+
+                elif kind == 'SWITCH_TARGET':
                     target_str = payload['target']
                     if target_str == AIRCRAFT_TARGET:
                         state["target"] = AIRCRAFT_TARGET
+                        if state["aircraft_tracker"] is None:
+                            state["aircraft_tracker"] = AircraftTracker(feed=self.aircraft_feed)
+                            self.aircraft_trackers[websocket] = state["aircraft_tracker"]
                         state["aircraft_tracker"].reset()
                         state["aircraft_status"] = "IDLE"
-                    elif target_str in CelestialBody.__members__:
-                        state["target"] = CelestialBody(target_str)
-                        state["aircraft_tracker"].reset()
+                        state["send_policy"].reset()
+                    elif (target := self.parse_target(target_str)) is not None:
+                        state["target"] = target
+                        if state["aircraft_tracker"] is not None:
+                            state["aircraft_tracker"].reset()
+                        state["aircraft_status"] = "IDLE"
+
+                elif kind == 'SUBSCRIBE':
+                    targets = [self.parse_target(t) for t in payload['targets'][:MAX_SUBSCRIBE_TARGETS]]
+                    targets = tuple(dict.fromkeys(t for t in targets if t is not None))
+                    if targets:
+                        state["target"] = targets
+                        if state["aircraft_tracker"] is not None:
+                            state["aircraft_tracker"].reset()
                         state["aircraft_status"] = "IDLE"
-                    
+
+                elif kind == 'SET_PRECISION':
+                    precision_str = payload['precision']
+                    if precision_str in Precision.__members__:
+                        state["precision"] = Precision(precision_str)
+
+                elif kind == 'SET_PUSH_INTERVAL':
+                    # Binary frames carry no rates, so only JSON clients can extrapolate.
+                    seconds = payload.get('seconds')
+                    if not state["binary"]:
+                        state["send_policy"].extrapolate(
+                            None if seconds is None
+                            else min(max(float(seconds), MIN_PUSH_INTERVAL), MAX_PUSH_INTERVAL)
+                        )
+
+                self.update_subscription(websocket, state)
+
         except WebSocketDisconnect:
             self.disconnect(websocket)
-            push_task.cancel()
         except Exception as e:
             print(f"Error: {e}")
             # Only disconnect if not already disconnected
             if websocket in self.active_connections:
                 self.disconnect(websocket)
-            push_task.cancel()
 
-    async def push_updates(self, websocket: WebSocket, state: dict):
-        try:
-            while True:
-                location = state["location"]
-                target = state["target"]
-
-                update: Optional[DirectionUpdate] = None
-                if location and target:
-                    if isinstance(target, CelestialBody):
-                        update = self.calculator.calculate_position(location, target)
-                    elif target == AIRCRAFT_TARGET:
-                        tracker: AircraftTracker = state["aircraft_tracker"]
-                        aircraft_update = await tracker.get_direction(location)
-                        if aircraft_update:
-                            update = aircraft_update
-                            if state["aircraft_status"] != "TRACKING":
-                                state["aircraft_status"] = "TRACKING"
-                        elif state["aircraft_status"] != "SEARCHING":
-                            state["aircraft_status"] = "SEARCHING"
-                            response = {
-                                "type": "AIRCRAFT_STATUS",
-                                "payload": {"state": "SEARCHING"}
-                            }
-                            await websocket.send_text(json.dumps(response))
-
-                if update:
-                    response = {
-                        "type": "POSITION_UPDATE",
-                        "payload": update.model_dump(mode='json')
-                    }
-                    await websocket.send_text(json.dumps(response))
-                
-                await asyncio.sleep(0.5) # 500ms update rate
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            print(f"Push error: {e}")
+    def apply_location(self, websocket: WebSocket, state: dict):
+        """Turn the connection's pending fix into its location."""
+        latitude, longitude, elevation = state["pending_location"]
+        state["pending_location"] = None
+        state["location"] = ObserverLocation(latitude=latitude, longitude=longitude, elevation=elevation)
+        self.update_subscription(websocket, state)
+
+    def apply_pending_locations(self, now: float):
+        """Scheduler hook: apply the fixes that arrived since the previous tick."""
+        pending, self._pending_locations = self._pending_locations, {}
+        for websocket, state in pending.items():
+            if websocket in self.outboxes and state["pending_location"] is not None:
+                self.apply_location(websocket, state)
+
+    def update_subscription(self, websocket: WebSocket, state: dict):
+        """Keep the connection in the broadcast group matching its state.
+
+        Aircraft depend on the exact position and a per-connection tracker, so
+        they get their own scheduler entry instead.
+        """
+        outbox = self.outboxes[websocket]
+        if state["location"] is None:
+            self.subscriptions.unsubscribe(outbox)
+            self.scheduler.remove(websocket)
+        elif state["target"] == AIRCRAFT_TARGET:
+            self.subscriptions.unsubscribe(outbox)
+            self.scheduler.add(websocket, partial(self.push_aircraft, outbox, state))
+        else:
+            self.scheduler.remove(websocket)
+            self.subscriptions.subscribe(
+                outbox, state["location"], state["target"], state["precision"], state["send_policy"],
+                binary=state["binary"],
+            )
+            self.scheduler.add(self.subscriptions, self.subscriptions.tick)
+
+    def encode_binary(self, update) -> Optional[bytes]:
+        updates = update if isinstance(update, list) else [update]
+        codes = [target_code(item.target_id, self.calculator.satellites) for item in updates]
+        if None in codes:
+            return None
+        return b"".join(encode_position(item, code) for item, code in zip(updates, codes))
+
+    async def compute_update(
+        self,
+        location: ObserverLocation,
+        target,
+        precision: Precision,
+        now: Optional[float] = None,
+    ):
+        # Calculation time is recorded where the work runs: here when inline,
+        # by the executor otherwise, so queue waits and rejections stay out.
+        if isinstance(target, tuple):
+            return await self.calculate_many(location, list(target), precision, now)
+        if isinstance(target, CelestialBody):
+            return await self.calculate_position(location, target, precision, now)
+        return await self.calculate_satellite_position(location, target, now)
+
+    def parse_target(self, target_str: str):
+        """Return the CelestialBody or known ``SAT:`` target named `target_str`, else None."""
+        if target_str in CelestialBody.__members__:
+            return CelestialBody(target_str)
+        satellites = self.calculator.satellites
+        if satellites is not None and satellites.lookup(target_str) is not None:
+            return target_str
+        return None
+
+    async def calculate_many(
+        self,
+        location: ObserverLocation,
+        targets: list,
+        precision: Precision,
+        now: Optional[float] = None,
+    ) -> list[Direction]:
+        if self.executor is None:
+            with CALCULATION_SECONDS.time():
+                return self.calculator.calculate_many(location, targets, precision=precision, now=now)
+        # ExecutorBusy propagates so the registry can serve this group first next tick.
+        return await self.executor.calculate_many(location, targets, precision, now)
+
+    async def calculate_satellite_position(
+        self,
+        location: ObserverLocation,
+        target: str,
+        now: Optional[float] = None,
+    ) -> Optional[Direction]:
+        if self.executor is None:
+            with CALCULATION_SECONDS.time():
+                return self.calculator.calculate_satellite_position(location, target, now=now)
+        return await self.executor.calculate_satellite_position(location, target, now)
+
+    async def calculate_position(
+        self,
+        location: ObserverLocation,
+        target: CelestialBody,
+        precision: Precision,
+        now: Optional[float] = None,
+    ) -> Optional[Direction]:
+        if self.executor is None:
+            with CALCULATION_SECONDS.time():
+                return self.calculator.calculate_position(location, target, precision=precision, now=now)
+        return await self.executor.calculate_position(location, target, precision, now)
+
+    async def push_aircraft(self, outbox: Outbox, state: dict, now: float):
+        """Scheduler callback for a connection tracking the aircraft overhead."""
+        location = state["location"]
+        tracker: AircraftTracker = state["aircraft_tracker"]
+        update = await tracker.get_direction(location)
+        if update:
+            if state["aircraft_status"] != "TRACKING":
+                state["aircraft_status"] = "TRACKING"
+            if not state["send_policy"].should_send(update, now):
+                return
+            with SERIALIZATION_SECONDS.time():
+                frame = encode_json(update)
+            outbox.push(frame)
+        elif state["aircraft_status"] != "SEARCHING":
+            state["aircraft_status"] = "SEARCHING"
+            response = {
+                "type": "AIRCRAFT_STATUS",
+                "payload": {"state": "SEARCHING"}
+            }
+            outbox.put(json.dumps(response))
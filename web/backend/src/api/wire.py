@@ -0,0 +1,91 @@
+"""Wire encodings of POSITION_UPDATE frames: compact JSON text and binary.
+
+Clients opt in by offering the ``omnicompass.binary.v1`` WebSocket
+subprotocol; everyone else keeps JSON text frames. A binary frame is one
+little-endian struct, 30 bytes against roughly 200 for the JSON form:
+
+    offset  type  field
+    0       u8    frame type (1 = POSITION_UPDATE)
+    1       u8    target kind (0 = celestial body, 1 = satellite)
+    2       u32   target id: index into CelestialBody, or NORAD number
+    6       f32   azimuth, degrees
+    10      f32   altitude, degrees
+    14      f64   distance, km
+    22      i64   timestamp, milliseconds since the Unix epoch
+
+A multi-target update is one such record per target, back to back in a
+single message. Aircraft updates carry optional flight details and stay
+JSON.
+"""
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any, Optional, Tuple, Union
+
+from ..domain.models import CelestialBody, Direction
+
+BINARY_SUBPROTOCOL = "omnicompass.binary.v1"
+
+FRAME_POSITION_UPDATE = 1
+KIND_CELESTIAL = 0
+KIND_SATELLITE = 1
+
+POSITION_FRAME = struct.Struct("<BBIffdq")
+
+# Reused for every frame; payloads are flat dicts, so the circular check is wasted work.
+JSON_ENCODER = json.JSONEncoder(check_circular=False, separators=(",", ":"))
+
+_CELESTIAL_IDS = {body.value: i for i, body in enumerate(CelestialBody)}
+_CELESTIAL_BODIES = list(CelestialBody)
+
+
+def target_code(target_id: str, satellites: Any = None) -> Optional[Tuple[int, int]]:
+    """Return (kind, id) for a target, or None if it has no binary form."""
+    index = _CELESTIAL_IDS.get(target_id)
+    if index is not None:
+        return KIND_CELESTIAL, index
+    if satellites is not None:
+        number = satellites.number(target_id)
+        if number is not None:
+            return KIND_SATELLITE, number
+    return None
+
+
+def encode_json(update: Union[Direction, list[Direction]]) -> str:
+    """The JSON text frame for `update`, without its None fields.
+
+    A list, from a multi-target SUBSCRIBE, becomes one POSITIONS_UPDATE frame.
+    """
+    if isinstance(update, list):
+        return JSON_ENCODER.encode({
+            "type": "POSITIONS_UPDATE",
+            "payload": {"updates": [item.payload() for item in update]},
+        })
+    return JSON_ENCODER.encode({"type": "POSITION_UPDATE", "payload": update.payload()})
+
+
+def encode_position(update: Direction, code: Tuple[int, int]) -> bytes:
+    kind, target = code
+    return POSITION_FRAME.pack(
+        FRAME_POSITION_UPDATE,
+        kind,
+        target,
+        update.azimuth,
+        update.altitude,
+        update.distance_km,
+        round(update.timestamp.timestamp() * 1000),
+    )
+
+
+def decode_position(frame: bytes) -> dict:
+    """Inverse of `encode_position`, for tests and Python clients."""
+    _, kind, target, azimuth, altitude, distance_km, timestamp_ms = POSITION_FRAME.unpack(frame)
+    target_id = _CELESTIAL_BODIES[target].value if kind == KIND_CELESTIAL else f"SAT:{target}"
+    return {
+        "target_id": target_id,
+        "azimuth": azimuth,
+        "altitude": altitude,
+        "distance_km": distance_km,
+        "timestamp_ms": timestamp_ms,
+    }
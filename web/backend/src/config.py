@@ -0,0 +1,57 @@
+from pydantic import BaseModel
+from .domain.models import Precision
+import os
+import typing
+
+
+class Settings(BaseModel):
+    """Deployment settings, overridable through ``OMNICOMPASS_<NAME>`` environment variables."""
+
+    # Run a throwaway computation before accepting traffic.
+    prewarm: bool = True
+    # Seconds covered by each interpolated trajectory segment; empty disables them.
+    trajectory_window: float | None = 600.0
+    # Default ephemeris tier; clients can switch with SET_PRECISION.
+    precision: Precision = Precision.HIGH
+    # Where calculations run: "thread" or "process" pool, or empty to run inline.
+    executor: str | None = "thread"
+    executor_workers: int = 2
+    # Calculations allowed to wait for a worker before ticks are dropped.
+    executor_queue_depth: int = 64
+    # Skip pushes until azimuth/altitude move this many degrees or distance by
+    # this fraction, but send at least one update every keyframe interval (s).
+    push_angle_deg: float = 0.01
+    push_distance_fraction: float = 1e-4
+    push_keyframe_interval: float = 5.0
+    # Close connections whose oldest unsent frame is older than this (seconds).
+    max_send_lag: float = 10.0
+    # Inbound messages allowed per connection per second, and in one burst;
+    # the excess is dropped, and clients far over it are disconnected.
+    inbound_rate: float = 20.0
+    inbound_burst: float = 40.0
+    # Aircraft are fetched per map tile of this many degrees, at most once per
+    # max-age seconds, and shared by all connections on the worker.
+    aircraft_tile_deg: float = 1.0
+    aircraft_max_age: float = 10.0
+    # TLE or OMM (.csv/.xml) file with satellites served as "SAT:<number or name>".
+    tle_file: str | None = None
+
+    # Unix socket of a snapshot producer (python -m src.producer). When set,
+    # workers take each tick's ephemeris from it and only project locally.
+    snapshot_feed: str | None = None
+
+    @classmethod
+    def from_env(cls, environ=None) -> "Settings":
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name, field in cls.model_fields.items():
+            key = f"OMNICOMPASS_{name.upper()}"
+            if key not in environ:
+                continue
+            if environ[key]:
+                values[name] = environ[key]
+            elif type(None) in typing.get_args(field.annotation):
+                # Empty switches optional settings off.
+                values[name] = None
+            # Otherwise empty means unset, so the default applies.
+        return cls(**values)
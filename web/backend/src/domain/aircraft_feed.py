@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from ..metrics import AIRCRAFT_FETCH_SECONDS
+from .flight_index import FlightIndex, grid_cells
+
+TileKey = Tuple[int, int]
+
+
+class AircraftFeed:
+    """Flights from FlightRadar24, fetched per map tile and shared by every tracker.
+
+    The map is cut into `tile_deg` squares. A tracker asks for the flights
+    around its observer; each tile that overlaps is queried upstream at most
+    once per `max_age` seconds, however many trackers need it, and callers
+    arriving while a query is in flight wait for that query instead of
+    starting another. Upstream traffic therefore follows the number of
+    tiles in use, not the number of connections.
+
+    Each tile's flights are held in a `FlightIndex`, rebuilt with every
+    query, so picking the nearest aircraft does not scan the whole tile.
+
+    A failed query is not retried for `retry_delay` seconds; callers get the
+    tile's last good flights (or none) meanwhile. Tiles nobody asked for in
+    `expire` seconds are dropped.
+    """
+
+    def __init__(
+        self,
+        *,
+        tile_deg: float = 1.0,
+        max_age: float = 10.0,
+        retry_delay: float = 5.0,
+        expire: float = 300.0,
+    ) -> None:
+        self.tile_deg = tile_deg
+        self.max_age = max_age
+        self.retry_delay = retry_delay
+        self.expire = expire
+        # (fetched at, last requested at, flights) by tile, monotonic seconds.
+        self._tiles: dict[TileKey, Tuple[float, float, FlightIndex]] = {}
+        self._loading: dict[TileKey, asyncio.Task] = {}
+        # FlightRadar24 is slow to import; load it on the first fetch.
+        self._api: Optional[Any] = None
+        self._api_lock = threading.Lock()
+        self.fetches = 0
+        self.failures = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def tiles_around(self, latitude: float, longitude: float, radius_km: float) -> list[TileKey]:
+        """Keys of the tiles overlapping the square of half-side `radius_km` around a point."""
+        rows, columns = grid_cells(latitude, longitude, radius_km, self.tile_deg)
+        return [(row, column) for row in rows for column in columns]
+
+    def bounds(self, key: TileKey) -> Tuple[float, float, float, float]:
+        """(north, south, west, east) of a tile, in degrees."""
+        row, column = key
+        south = row * self.tile_deg
+        west = column * self.tile_deg
+        if west >= 180.0:
+            west -= 360.0
+        return south + self.tile_deg, south, west, west + self.tile_deg
+
+    async def flights_near(self, latitude: float, longitude: float, radius_km: float) -> list[Any]:
+        """Flights in every tile overlapping `radius_km` around the point."""
+        tiles = self.tiles_around(latitude, longitude, radius_km)
+        found = await asyncio.gather(*(self._tile(key) for key in tiles))
+        return [flight for index in found for flight in index.flights]
+
+    async def nearest(self, latitude: float, longitude: float, radius_km: float) -> Optional[Any]:
+        """The flight nearest the point within `radius_km`, or None."""
+        tiles = self.tiles_around(latitude, longitude, radius_km)
+        best: Optional[Tuple[float, Any]] = None
+        for index in await asyncio.gather(*(self._tile(key) for key in tiles)):
+            found, distance = index.nearest(latitude, longitude, radius_km)
+            if found[0, 0] >= 0 and (best is None or distance[0, 0] < best[0]):
+                best = (distance[0, 0], index.flights[found[0, 0]])
+        return best[1] if best is not None else None
+
+    async def _tile(self, key: TileKey) -> FlightIndex:
+        now = time.monotonic()
+        cached = self._tiles.get(key)
+        if cached is not None:
+            self._tiles[key] = (cached[0], now, cached[2])
+            if now - cached[0] < self.max_age:
+                self.hits += 1
+                return cached[2]
+
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key))
+            self._loading[key] = task
+        # Shielded so one caller giving up does not cancel the query for the others.
+        return await asyncio.shield(task)
+
+    async def _load(self, key: TileKey) -> FlightIndex:
+        previous = self._tiles.get(key)
+        try:
+            with AIRCRAFT_FETCH_SECONDS.time():
+                index = await asyncio.to_thread(self._fetch_index, key)
+            self.fetches += 1
+        except Exception as exc:
+            self.failures += 1
+            print(f"FlightRadarAPI fetch failed for tile {key}: {exc}")
+            # Pretend the old data is recent enough to hold off retries for a while.
+            now = time.monotonic()
+            index = previous[2] if previous is not None else FlightIndex([])
+            self._tiles[key] = (now - self.max_age + self.retry_delay, now, index)
+            return index
+        finally:
+            self._loading.pop(key, None)
+
+        now = time.monotonic()
+        self._tiles[key] = (now, now, index)
+        self._expire(now)
+        return index
+
+    def _expire(self, now: float) -> None:
+        for key in [key for key, (_, requested, _) in self._tiles.items() if now - requested > self.expire]:
+            del self._tiles[key]
+
+    def _fetch_index(self, key: TileKey) -> FlightIndex:
+        return FlightIndex(self.fetch_tile(*self.bounds(key)))
+
+    def fetch_tile(self, north: float, south: float, west: float, east: float) -> list[Any]:
+        """Query FlightRadar24 for one tile; runs on a worker thread."""
+        with self._api_lock:
+            if self._api is None:
+                from FlightRadar24 import FlightRadar24API
+
+                self._api = FlightRadar24API()
+        bounds = self._api.get_bounds({"tl_y": north, "br_y": south, "tl_x": west, "br_x": east})
+        return self._api.get_flights(bounds=bounds)
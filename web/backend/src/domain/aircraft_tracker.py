@@ -3,13 +3,16 @@ from __future__ import annotations
 import asyncio
 import math
 import time
+from datetime import datetime, timezone
 from typing import Any, Optional, Tuple
 
-from FlightRadar24 import FlightRadar24API
-from skyfield.api import Topos
+import numpy as np
 
-from .calculator import CelestialCalculator
-from .models import DirectionUpdate, ObserverLocation
+from ..metrics import AIRCRAFT_DIRECTION_SECONDS
+from . import geodesy
+from .aircraft_feed import AircraftFeed
+from .models import Direction, ObserverLocation
+from .motion import angular_rates
 
 # Conversion helper for feet to meters when altitude information is provided.
 FEET_TO_METERS = 0.3048
@@ -26,30 +29,30 @@ class _InterpolatedFlight:
 
 
 class AircraftTracker:
-    """Polls FlightRadar24 for nearby aircraft and computes pointing data."""
+    """Picks the aircraft nearest an observer from an `AircraftFeed` and computes pointing data."""
 
     def __init__(
         self,
-        calculator: CelestialCalculator,
         *,
+        feed: Optional[AircraftFeed] = None,
         radius_km: float = 15.0,
         refresh_interval: float = 60.0,
         tracking_interval: float = 10.0,
     ) -> None:
-        self._calculator = calculator
+        # Normally shared by every tracker in the worker.
+        self._feed = feed if feed is not None else AircraftFeed()
         self._radius_km = radius_km
         self._refresh_interval = refresh_interval
         self._tracking_interval = tracking_interval
-        self._api = FlightRadar24API()
 
         self._lock = asyncio.Lock()
         self._tracked_flight: Optional[Any] = None
         self._last_flight_update_ts: Optional[float] = None
         self._last_fetch_ts: Optional[float] = None
-        self._last_direction: Optional[DirectionUpdate] = None
+        self._last_direction: Optional[Direction] = None
         self._last_location: Optional[Tuple[float, float]] = None
 
-    async def get_direction(self, observer: ObserverLocation) -> Optional[DirectionUpdate]:
+    async def get_direction(self, observer: ObserverLocation) -> Optional[Direction]:
         """Return pointing info for the tracked aircraft if one is available."""
         async with self._lock:
             location_changed = self._location_shifted(observer)
@@ -68,7 +71,8 @@ class AircraftTracker:
                 return None
 
             interpolated_flight = self._interpolate_flight(self._tracked_flight)
-            direction = self._build_direction(observer, interpolated_flight)
+            with AIRCRAFT_DIRECTION_SECONDS.time():
+                direction = self._build_direction(observer, interpolated_flight)
             self._last_direction = direction
             return direction
 
@@ -101,22 +105,8 @@ class AircraftTracker:
         return _InterpolatedFlight(flight, new_lat, new_lon)
 
     def _calculate_new_position(self, lat: float, lon: float, distance_km: float, bearing_deg: float) -> Tuple[float, float]:
-        R = 6371.0  # Earth radius in km
-        lat1 = math.radians(lat)
-        lon1 = math.radians(lon)
-        bearing = math.radians(bearing_deg)
-
-        lat2 = math.asin(
-            math.sin(lat1) * math.cos(distance_km / R)
-            + math.cos(lat1) * math.sin(distance_km / R) * math.cos(bearing)
-        )
-
-        lon2 = lon1 + math.atan2(
-            math.sin(bearing) * math.sin(distance_km / R) * math.cos(lat1),
-            math.cos(distance_km / R) - math.sin(lat1) * math.sin(lat2),
-        )
-
-        return math.degrees(lat2), math.degrees(lon2)
+        new_lat, new_lon = geodesy.destination(lat, lon, distance_km, bearing_deg)
+        return float(new_lat), float(new_lon)
 
     def _needs_refresh(self, now: float) -> bool:
         if self._last_fetch_ts is None:
@@ -143,83 +133,31 @@ class AircraftTracker:
 
     async def _refresh_flights(self, observer: ObserverLocation) -> None:
         try:
-            flights = await asyncio.to_thread(self._fetch_flights, observer)
+            updated = await self._feed.nearest(observer.latitude, observer.longitude, self._radius_km)
         except Exception as exc:  # pragma: no cover - defensive logging for API errors
             print(f"FlightRadarAPI fetch failed: {exc}")
             return
 
-        if not flights:
-            self._tracked_flight = None
-            return
-
-        updated = self._select_tracked_flight(observer, flights)
         self._tracked_flight = updated
         if updated:
             # Prefer the flight's timestamp if available, otherwise use current time
             self._last_flight_update_ts = getattr(updated, "time", None) or time.time()
 
-    def _fetch_flights(self, observer: ObserverLocation) -> list[Any]:
-        bounds = self._api.get_bounds_by_point(
-            observer.latitude,
-            observer.longitude,
-            self._radius_km * 1000,
-        )
-        return self._api.get_flights(bounds=bounds)
-
-    def _select_tracked_flight(self, observer: ObserverLocation, flights: list[Any]) -> Optional[Any]:
-        nearest: Optional[Tuple[float, Any]] = None
-        for flight in flights:
-            if flight.latitude is None or flight.longitude is None:
-                continue
-            distance = self._distance_to_observer(observer, flight)
-            if distance is None or distance > self._radius_km:
-                continue
-            if nearest is None or distance < nearest[0]:
-                nearest = (distance, flight)
-
-        return nearest[1] if nearest else None
-
-    def _within_radius(self, observer: ObserverLocation, flight: Any) -> bool:
-        distance = self._distance_to_observer(observer, flight)
-        return bool(distance is not None and distance <= self._radius_km)
-
-    def _distance_to_observer(self, observer: ObserverLocation, flight: Any) -> Optional[float]:
-        lat = getattr(flight, "latitude", None)
-        lon = getattr(flight, "longitude", None)
-        if lat is None or lon is None:
-            return None
-        return self._surface_distance_km(
-            (observer.latitude, observer.longitude),
-            (lat, lon),
-        )
-
     def _surface_distance_km(self, origin: Tuple[float, float], target: Tuple[float, float]) -> float:
-        lat1, lon1 = map(math.radians, origin)
-        lat2, lon2 = map(math.radians, target)
-        cosine = (
-            math.sin(lat1) * math.sin(lat2)
-            + math.cos(lat1) * math.cos(lat2) * math.cos(lon2 - lon1)
-        )
-        cosine = max(min(cosine, 1.0), -1.0)
-        return math.acos(cosine) * 6371
-
-    def _build_direction(self, observer: ObserverLocation, flight: Any) -> DirectionUpdate:
-        t = self._calculator.ts.now()
-        observer_topos = self._calculator.earth + Topos(
-            latitude_degrees=observer.latitude,
-            longitude_degrees=observer.longitude,
-            elevation_m=observer.elevation,
-        )
+        return float(geodesy.great_circle_km(origin[0], origin[1], target[0], target[1]))
 
+    def _build_direction(self, observer: ObserverLocation, flight: Any) -> Direction:
+        latitude = float(flight.latitude)
+        longitude = float(flight.longitude)
         altitude_m = float(getattr(flight, "altitude", 0.0) or 0.0) * FEET_TO_METERS
-        target_topos = self._calculator.earth + Topos(
-            latitude_degrees=float(flight.latitude),
-            longitude_degrees=float(flight.longitude),
-            elevation_m=altitude_m,
-        )
 
-        apparent = observer_topos.at(t).observe(target_topos).apparent()
-        alt, az, distance = apparent.altaz()
+        # East/north/up metres from the observer; see geodesy for why no light
+        # time or aberration is applied.
+        position = geodesy.topocentric(
+            observer.latitude, observer.longitude, observer.elevation,
+            latitude, longitude, altitude_m,
+        )
+        azimuth, elevation, distance_m = geodesy.horizon(position)
 
         # Extract additional aircraft details
         ground_speed_knots = float(getattr(flight, "ground_speed", 0) or 0)
@@ -233,22 +171,36 @@ class AircraftTracker:
 
         horizontal_distance = self._surface_distance_km(
             (observer.latitude, observer.longitude),
-            (float(flight.latitude), float(flight.longitude))
+            (latitude, longitude)
+        )
+
+        # Dead-reckoned velocity in m/s, east/north/up at the aircraft, turned
+        # into the observer's frame.
+        heading = math.radians(float(getattr(flight, "heading", 0) or 0))
+        ground_speed_mps = ground_speed_kmh / 3.6
+        velocity = geodesy.ecef_to_enu(
+            geodesy.enu_to_ecef(
+                np.array([ground_speed_mps * math.sin(heading), ground_speed_mps * math.cos(heading),
+                          vertical_speed_mps]),
+                latitude, longitude,
+            ),
+            observer.latitude, observer.longitude,
         )
+        rates = angular_rates(position, velocity, np.zeros(3))
 
-        return DirectionUpdate(
+        return Direction(
             target_id=self._format_target_id(flight),
-            azimuth=az.degrees,
-            altitude=alt.degrees,
-            distance_km=distance.km,
-            timestamp=t.utc_datetime(),
+            azimuth=float(azimuth),
+            altitude=float(elevation),
+            distance_km=float(distance_m) / 1000.0,
+            timestamp=datetime.now(timezone.utc),
             aircraft_altitude_m=altitude_m,
             ground_speed_kmh=ground_speed_kmh,
             origin_airport=origin,
             destination_airport=destination,
             vertical_speed_mps=vertical_speed_mps,
             horizontal_distance_km=horizontal_distance,
-        )
+        ).set_rates(rates)
 
     def _format_target_id(self, flight: Any) -> str:
         return (
@@ -1,50 +1,502 @@
-from skyfield.api import Loader, Topos
-from .models import ObserverLocation, DirectionUpdate, CelestialBody
+from skyfield.api import Loader, Topos, load_file
+from skyfield.constants import AU_KM, DAY_S
+from skyfield.framelib import itrs
+from skyfield.functions import mxv
+from .kernel import BODY_NAMES, coverage, load_kernel
+from .low_precision import earth_fixed_positions
+from .models import ObserverLocation, Direction, CelestialBody, Precision
+from .motion import angular_rates, enu, rotating_frame_motion
+from .observer_cache import ObserverCache
+from .satellites import SatelliteCatalog, SatellitePositions
+from .snapshot_feed import SnapshotSubscriber
+from .trajectory import TrajectoryCache
+import math
+import numpy as np
 import os
+import threading
+import time
+from datetime import datetime, timezone
+
+# Half-width of the central differences giving low-precision body motion, seconds.
+LOW_PRECISION_STEP_S = 30.0
+# Cache key of the snapshot that carries satellites but no bodies.
+SATELLITES_ONLY = "satellites"
+
+
+class EphemerisSnapshot:
+    """Body states for a single instant, shared by every observer in a tick.
+
+    The expensive part of pointing at a body -- the barycentric Earth, the
+    light-time iteration, deflection and aberration -- does not depend on where
+    on Earth the observer stands. It is done once per snapshot, from the
+    geocenter, and kept as apparent vectors in the Earth-fixed ITRS frame.
+    `project` then only subtracts the observer's position and rotates into
+    their horizon.
+
+    Compared to a full per-observer `observe().apparent()` the result differs
+    by the diurnal aberration and the observer's extra light time, both well
+    under one arcsecond.
+    """
+
+    def __init__(
+        self,
+        t,
+        itrs_au: dict,
+        precision: Precision = Precision.HIGH,
+        satellites: SatellitePositions | None = None,
+        motion: dict | None = None,
+    ):
+        self.t = t
+        self.timestamp = t.utc_datetime()
+        self.created = time.monotonic()
+        self.precision = precision
+        self._itrs_au = itrs_au
+        self.satellites = satellites
+        # ITRS (velocity AU/s, acceleration AU/s^2) by body, for angular rates.
+        self._motion = motion if motion is not None else {
+            target: rotating_frame_motion(vector) for target, vector in itrs_au.items()
+        }
+
+    def position(self, target: CelestialBody | str) -> np.ndarray | None:
+        """Geocentric ITRS vector (AU) of a body or ``SAT:`` target, None if unavailable."""
+        if isinstance(target, CelestialBody):
+            return self._itrs_au.get(target)
+        if self.satellites is None:
+            return None
+        found = self.satellites.get(target)
+        if found is None or np.isnan(found[1]).any():
+            return None
+        return found[1]
+
+    def motion(self, target: CelestialBody | str) -> tuple[np.ndarray, np.ndarray] | None:
+        """ITRS (velocity, acceleration) of a body or ``SAT:`` target, None if unavailable."""
+        if isinstance(target, CelestialBody):
+            return self._motion.get(target)
+        if self.satellites is None:
+            return None
+        return self.satellites.motion(target)
+
+    def rates(self, topos: Topos, target: CelestialBody | str) -> tuple[float, float, float, float] | None:
+        """(azimuth_rate, altitude_rate, azimuth_accel, altitude_accel) of `target` from `topos`.
+
+        Degrees per second and per second squared, for clients extrapolating
+        between updates; the observer is at rest in the Earth-fixed frame.
+        """
+        position = self.position(target)
+        motion = self.motion(target)
+        if position is None or motion is None:
+            return None
+        lat = topos.latitude.radians
+        lon = topos.longitude.radians
+        velocity, acceleration = motion
+        return angular_rates(
+            enu(position - topos.itrs_xyz.au, lat, lon),
+            enu(velocity, lat, lon),
+            enu(acceleration, lat, lon),
+        )
+
+    def project(self, topos: Topos, target: CelestialBody) -> tuple[float, float, float]:
+        """Return (altitude, azimuth, distance_km) of `target` seen from `topos`."""
+        return self.project_vector(topos, self._itrs_au[target])
+
+    def project_vector(self, topos: Topos, itrs_au: np.ndarray) -> tuple[float, float, float]:
+        """`project` for a geocentric ITRS position (AU) rather than a named body."""
+        x, y, z = itrs_au - topos.itrs_xyz.au
+
+        lat = topos.latitude.radians
+        lon = topos.longitude.radians
+        sin_lat, cos_lat = math.sin(lat), math.cos(lat)
+        sin_lon, cos_lon = math.sin(lon), math.cos(lon)
+
+        east = -sin_lon * x + cos_lon * y
+        north = -sin_lat * cos_lon * x - sin_lat * sin_lon * y + cos_lat * z
+        up = cos_lat * cos_lon * x + cos_lat * sin_lon * y + sin_lat * z
+
+        altitude = math.degrees(math.atan2(up, math.hypot(east, north)))
+        azimuth = math.degrees(math.atan2(east, north)) % 360.0
+        distance_km = math.sqrt(x * x + y * y + z * z) * AU_KM
+        return altitude, azimuth, distance_km
+
+    def project_many(self, topos: Topos, targets: list[CelestialBody]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized `project` for an array-valued `topos` and several targets.
+
+        Returns (altitude, azimuth, distance_km) arrays shaped
+        ``(len(targets), n_observers)``.
+        """
+        bodies = np.stack([self._itrs_au[target] for target in targets], axis=1)
+        x, y, z = bodies[:, :, np.newaxis] - topos.itrs_xyz.au[:, np.newaxis, :]
+        return horizon_coordinates(x, y, z, topos.latitude.radians, topos.longitude.radians)
+
+
+def horizon_coordinates(x, y, z, lat, lon) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Turn observer-relative ITRS vectors (AU) into (altitude, azimuth, distance_km).
+
+    Arrays broadcast, with `lat` and `lon` in radians.
+    """
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    sin_lon, cos_lon = np.sin(lon), np.cos(lon)
+
+    east = -sin_lon * x + cos_lon * y
+    north = -sin_lat * cos_lon * x - sin_lat * sin_lon * y + cos_lat * z
+    up = cos_lat * cos_lon * x + cos_lat * sin_lon * y + sin_lat * z
+
+    altitude = np.degrees(np.arctan2(up, np.hypot(east, north)))
+    azimuth = np.degrees(np.arctan2(east, north)) % 360.0
+    distance_km = np.sqrt(x * x + y * y + z * z) * AU_KM
+    return altitude, azimuth, distance_km
+
 
 class CelestialCalculator:
-    def __init__(self):
+    def __init__(
+        self,
+        snapshot_interval: float = 0.5,
+        observer_precision_m: float = 1.0,
+        observer_cache_size: int = 4096,
+        trajectory_window: float | None = None,
+        ephemeris: str | None = None,
+        precision: Precision = Precision.HIGH,
+        tle_path: str | None = None,
+        snapshot_feed: str | None = None,
+    ):
         data_dir = os.path.join(os.path.dirname(__file__), 'data')
         load = Loader(data_dir)
-        self.planets = load('de421.bsp')
         self.ts = load.timescale()
-        self.earth = self.planets['earth']
-        self.sun = self.planets['sun']
-        self.mars = self.planets['mars']
-        self.venus = self.planets['venus']
-        self.saturn = self.planets['saturn barycenter']
-        self.jupiter = self.planets['jupiter barycenter']
-        self.moon = self.planets['moon']
-
-    def calculate_position(self, location: ObserverLocation, target: CelestialBody) -> DirectionUpdate:
-        t = self.ts.now()
-        observer = self.earth + Topos(latitude_degrees=location.latitude, 
-                                      longitude_degrees=location.longitude, 
-                                      elevation_m=location.elevation)
-        
-        if target == CelestialBody.SUN:
-            target_body = self.sun
-        elif target == CelestialBody.MARS:
-            target_body = self.mars
-        elif target == CelestialBody.VENUS:
-            target_body = self.venus
-        elif target == CelestialBody.SATURN:
-            target_body = self.saturn
-        elif target == CelestialBody.JUPITER:
-            target_body = self.jupiter
-        elif target == CelestialBody.MOON:
-            target_body = self.moon
+        if ephemeris:
+            self.planets = load_file(ephemeris)
         else:
+            # Prefer the trimmed kernel written by scripts/download_data.py.
+            self.planets = load_kernel(load, data_dir, self.ts.now().tdb)
+        self.earth = self.planets['earth']
+        # TDB Julian dates the loaded kernel can answer for; the trimmed
+        # subset spans only a few years around its build date.
+        self.ephemeris_range = coverage(self.planets)
+
+        self._bodies = {target: self.planets[name] for target, name in BODY_NAMES.items()}
+        self.sun = self._bodies[CelestialBody.SUN]
+        self.mars = self._bodies[CelestialBody.MARS]
+        self.venus = self._bodies[CelestialBody.VENUS]
+        self.saturn = self._bodies[CelestialBody.SATURN]
+        self.jupiter = self._bodies[CelestialBody.JUPITER]
+        self.moon = self._bodies[CelestialBody.MOON]
+        self.observers = ObserverCache(
+            self.earth,
+            precision_m=observer_precision_m,
+            maxsize=observer_cache_size,
+        )
+
+        # Connections ask for positions independently; any request made within
+        # `snapshot_interval` seconds of the last snapshot reuses it.
+        self.snapshot_interval = snapshot_interval
+        # Keyed by tier, plus SATELLITES_ONLY for `_satellite_snapshot`.
+        self._snapshots: dict[Precision | str, EphemerisSnapshot] = {}
+        # POSIX time of the tick each snapshot was built for, if any.
+        self._snapshot_ticks: dict[Precision | str, float] = {}
+        self._snapshot_lock = threading.Lock()
+        # Default tier; callers may ask for the other one per call.
+        self.precision = precision
+
+        # With a trajectory window, high-precision calls without an explicit
+        # snapshot are served from interpolated per-observer segments instead.
+        self.trajectories: TrajectoryCache | None = None
+        if trajectory_window:
+            self.trajectories = TrajectoryCache(self, window=trajectory_window)
+
+        # Optional TLE/OMM catalogue, propagated once per snapshot for all observers.
+        self.satellites: SatelliteCatalog | None = None
+        if tle_path:
+            self.satellites = SatelliteCatalog(tle_path, self.ts)
+
+        # Snapshots published by a producer process (see snapshot_feed) replace
+        # local computation while they are fresh.
+        self._shared: dict[Precision, EphemerisSnapshot] = {}
+        self.feed: SnapshotSubscriber | None = None
+        if snapshot_feed:
+            self.feed = SnapshotSubscriber(self, snapshot_feed)
+            self.feed.start()
+
+    def body(self, target: CelestialBody):
+        """Return the skyfield vector function for `target`, defaulting to the Sun."""
+        return self._bodies.get(target, self.sun)
+
+    def snapshot(self, t=None, precision: Precision | None = None) -> EphemerisSnapshot:
+        """Compute the geocentric apparent state of every body at `t` (default: now)."""
+        if t is None:
+            t = self.ts.now()
+        precision = precision or self.precision
+        satellites = self.satellites.propagate(t) if self.satellites is not None else None
+        if precision == Precision.LOW:
+            positions = earth_fixed_positions(t.tt, t.ut1)
+            # The series are cheap, so their motion comes from central differences.
+            step = LOW_PRECISION_STEP_S / DAY_S
+            before = earth_fixed_positions(t.tt - step, t.ut1 - step)
+            after = earth_fixed_positions(t.tt + step, t.ut1 + step)
+            motion = {
+                target: (
+                    (after[target] - before[target]) / (2 * LOW_PRECISION_STEP_S),
+                    (after[target] - 2 * vector + before[target]) / LOW_PRECISION_STEP_S ** 2,
+                )
+                for target, vector in positions.items()
+            }
+            return EphemerisSnapshot(t, positions, Precision.LOW, satellites, motion)
+
+        geocenter = self.earth.at(t)
+        positions, motion = {}, {}
+        for target, body in self._bodies.items():
+            position, velocity = geocenter.observe(body).apparent().frame_xyz_and_velocity(itrs)
+            positions[target] = position.au
+            motion[target] = rotating_frame_motion(position.au, velocity.au_per_d / DAY_S)
+        return EphemerisSnapshot(t, positions, satellites=satellites, motion=motion)
+
+    def current_snapshot(self, precision: Precision | None = None, now: float | None = None) -> EphemerisSnapshot:
+        """Return the snapshot for the current tick, computing it if it has expired.
+
+        With `now` (POSIX seconds, as handed out by the tick scheduler) the
+        snapshot is taken at exactly that instant and shared by every caller
+        passing the same value.
+        """
+        precision = precision or self.precision
+        shared = self._shared.get(precision)
+        if shared is not None and time.monotonic() - shared.created < 2 * self.snapshot_interval:
+            return shared
+        return self._cached_snapshot(precision, now, lambda t: self.snapshot(t, precision))
+
+    def _satellite_snapshot(self, now: float | None = None) -> EphemerisSnapshot:
+        """A snapshot holding only the propagated satellites, cached like `current_snapshot`.
+
+        SGP4 does not need the planetary ephemeris, so when bodies are served
+        from trajectories this keeps ``SAT:`` targets from forcing a full
+        high-precision snapshot every tick.
+        """
+        shared = self._shared.get(self.precision)
+        if shared is not None and time.monotonic() - shared.created < 2 * self.snapshot_interval:
+            return shared
+
+        def build(t):
+            if t is None:
+                t = self.ts.now()
+            satellites = self.satellites.propagate(t) if self.satellites is not None else None
+            return EphemerisSnapshot(t, {}, self.precision, satellites, {})
+
+        return self._cached_snapshot(SATELLITES_ONLY, now, build)
+
+    def _cached_snapshot(self, key: Precision | str, now: float | None, build) -> EphemerisSnapshot:
+        with self._snapshot_lock:
+            snapshot = self._snapshots.get(key)
+            if now is not None:
+                if snapshot is None or self._snapshot_ticks.get(key) != now:
+                    snapshot = build(self.ts.from_datetime(datetime.fromtimestamp(now, timezone.utc)))
+                    self._snapshots[key] = snapshot
+                    self._snapshot_ticks[key] = now
+            elif snapshot is None or time.monotonic() - snapshot.created >= self.snapshot_interval:
+                snapshot = build(None)
+                self._snapshots[key] = snapshot
+                self._snapshot_ticks.pop(key, None)
+        return snapshot
+
+    def export_snapshot(self, snapshot: EphemerisSnapshot) -> dict:
+        """Plain-data form of `snapshot` for another process's `adopt_snapshot`."""
+        return {
+            # Split like skyfield does, so the instant survives the trip exactly.
+            "tt": (snapshot.t.whole, snapshot.t.tt_fraction),
+            "precision": snapshot.precision,
+            "itrs_au": snapshot._itrs_au,
+            "satellites": None if snapshot.satellites is None else snapshot.satellites.export(),
+            "motion": snapshot._motion,
+        }
+
+    def adopt_snapshot(self, payload: dict) -> EphemerisSnapshot:
+        """Install a snapshot computed elsewhere as the current one for its tier."""
+        snapshot = EphemerisSnapshot(
+            self.ts.tt_jd(*payload["tt"]),
+            payload["itrs_au"],
+            payload["precision"],
+            None if payload["satellites"] is None else SatellitePositions(*payload["satellites"]),
+            payload.get("motion"),
+        )
+        self._shared[snapshot.precision] = snapshot
+        return snapshot
+
+    def prewarm(self) -> None:
+        """Pay one-off costs (timescale tables, first snapshot and fits) before serving."""
+        location = ObserverLocation(latitude=0.0, longitude=0.0)
+        snapshot = self.current_snapshot()
+        self.calculate_positions([0.0], [0.0], [0.0], list(self._bodies), snapshot=snapshot)
+        for target in self._bodies:
+            self.calculate_position(location, target)
+
+    def calculate_position(
+        self,
+        location: ObserverLocation,
+        target: CelestialBody,
+        snapshot: EphemerisSnapshot | None = None,
+        precision: Precision | None = None,
+        now: float | None = None,
+    ) -> Direction:
+        """Direction to `target`; `now` (POSIX seconds) pins the interpolated path to a tick."""
+        if target not in self._bodies:
             # Fallback or error, but for now default to Sun
-            target_body = self.sun
-        
-        apparent = observer.at(t).observe(target_body).apparent()
-        alt, az, distance = apparent.altaz()
-        
-        return DirectionUpdate(
+            target = CelestialBody.SUN
+        precision = precision or self.precision
+
+        if snapshot is None and precision == Precision.HIGH and self.trajectories is not None:
+            if now is None:
+                now = time.time()
+            alt, az, distance_km, timestamp, rates = self.trajectories.position_and_rates(location, target, now)
+            return Direction(
+                target_id=target.value,
+                azimuth=az,
+                altitude=alt,
+                distance_km=distance_km,
+                timestamp=timestamp
+            ).set_rates(rates)
+
+        if snapshot is None:
+            snapshot = self.current_snapshot(precision, now)
+        # The cached observer is ``earth + Topos``; its target is the Topos.
+        observer = self.observers.get(location).target
+        alt, az, distance_km = snapshot.project(observer, target)
+
+        return Direction(
             target_id=target.value,
-            azimuth=az.degrees,
-            altitude=alt.degrees,
-            distance_km=distance.km,
-            timestamp=t.utc_datetime()
+            azimuth=az,
+            altitude=alt,
+            distance_km=distance_km,
+            timestamp=snapshot.timestamp
+        ).set_rates(snapshot.rates(observer, target))
+
+    def calculate_satellite_position(
+        self,
+        location: ObserverLocation,
+        target: str,
+        snapshot: EphemerisSnapshot | None = None,
+        now: float | None = None,
+    ) -> Direction | None:
+        """Direction to a ``SAT:`` target, or None if it is unknown or failed to propagate."""
+        if snapshot is None and self.trajectories is not None:
+            snapshot = self._satellite_snapshot(now)
+        elif snapshot is None:
+            # Celestial subscribers build this tick's snapshot anyway; share it.
+            snapshot = self.current_snapshot(now=now)
+        if snapshot.satellites is None:
+            return None
+        found = snapshot.satellites.get(target)
+        if found is None or np.isnan(found[1]).any():
+            return None
+
+        observer = self.observers.get(location).target
+        alt, az, distance_km = snapshot.project_vector(observer, found[1])
+        return Direction(
+            target_id=target,
+            azimuth=az,
+            altitude=alt,
+            distance_km=distance_km,
+            timestamp=snapshot.timestamp
+        ).set_rates(snapshot.rates(observer, target))
+
+    def calculate_many(
+        self,
+        location: ObserverLocation,
+        targets: list[CelestialBody | str],
+        precision: Precision | None = None,
+        now: float | None = None,
+    ) -> list[Direction]:
+        """Directions to several targets from one observer, all at the same instant.
+
+        From a snapshot this is one vectorized projection. With trajectories
+        enabled at high precision each body is instead read from its own
+        cached segment, and each satellite from the satellite-only snapshot,
+        one target at a time: a few dozen microseconds each, which a batched
+        NumPy evaluation of a handful of targets would not beat.
+
+        Targets that are unknown or failed to propagate are left out.
+        """
+        precision = precision or self.precision
+        if precision == Precision.HIGH and self.trajectories is not None:
+            if now is None:
+                now = time.time()
+            # Bodies from their interpolated paths, satellites from a
+            # satellite-only snapshot, all at the same instant.
+            directions = [
+                self.calculate_position(location, target, now=now) if isinstance(target, CelestialBody)
+                else self.calculate_satellite_position(location, target, now=now)
+                for target in targets
+            ]
+            return [direction for direction in directions if direction is not None]
+
+        snapshot = self.current_snapshot(precision, now)
+        found = [(target, snapshot.position(target)) for target in targets]
+        found = [(target, vector) for target, vector in found if vector is not None]
+        if not found:
+            return []
+
+        observer = self.observers.get(location).target
+        x, y, z = np.stack([vector for _, vector in found], axis=1) - observer.itrs_xyz.au[:, np.newaxis]
+        altitudes, azimuths, distances = horizon_coordinates(
+            x, y, z, observer.latitude.radians, observer.longitude.radians,
         )
+        return [
+            Direction(
+                target_id=target.value if isinstance(target, CelestialBody) else target,
+                azimuth=float(azimuths[i]),
+                altitude=float(altitudes[i]),
+                distance_km=float(distances[i]),
+                timestamp=snapshot.timestamp
+            ).set_rates(snapshot.rates(observer, target))
+            for i, (target, _) in enumerate(found)
+        ]
+
+    def calculate_rows(
+        self,
+        latitudes,
+        longitudes,
+        elevations,
+        target: CelestialBody | str,
+        t,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+        """High-precision positions of one target for many (observer, time) rows.
+
+        Row ``i`` is the observer at ``latitudes[i]``, ``longitudes[i]``,
+        ``elevations[i]`` (metres) at ``t[i]``, an array-valued skyfield Time.
+        Unlike the snapshot path every row has its own instant, so the
+        ephemeris is evaluated once per row, vectorized. Returns
+        (altitude, azimuth, distance_km) arrays, or None for an unknown
+        satellite.
+        """
+        if isinstance(target, CelestialBody) or self.satellites is None:
+            body = self.body(target)
+            gcrs = self.earth.at(t).observe(body).apparent().xyz.au
+            itrs_au = mxv(itrs.rotation_at(t), gcrs)
+        else:
+            itrs_au = self.satellites.positions(target, t)
+            if itrs_au is None:
+                return None
+
+        observers = Topos(latitude_degrees=np.asarray(latitudes, dtype=float),
+                          longitude_degrees=np.asarray(longitudes, dtype=float),
+                          elevation_m=np.asarray(elevations, dtype=float))
+        x, y, z = itrs_au - observers.itrs_xyz.au
+        return horizon_coordinates(x, y, z, observers.latitude.radians, observers.longitude.radians)
+
+    def calculate_positions(
+        self,
+        latitudes,
+        longitudes,
+        elevations,
+        targets: list[CelestialBody],
+        snapshot: EphemerisSnapshot | None = None,
+        precision: Precision | None = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Batch form of `calculate_position` for many observers and targets.
+
+        `latitudes`, `longitudes` and `elevations` (metres) are equal-length
+        arrays, one entry per observer. Returns (altitude, azimuth,
+        distance_km) arrays shaped ``(len(targets), n_observers)``, all
+        evaluated at the same snapshot instant.
+        """
+        if snapshot is None:
+            snapshot = self.current_snapshot(precision)
+        observers = Topos(latitude_degrees=np.asarray(latitudes, dtype=float),
+                          longitude_degrees=np.asarray(longitudes, dtype=float),
+                          elevation_m=np.asarray(elevations, dtype=float))
+        targets = [target if target in self._bodies else CelestialBody.SUN for target in targets]
+        return snapshot.project_many(observers, targets)
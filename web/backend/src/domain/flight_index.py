@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Iterable, Tuple
+
+import numpy as np
+
+from .geodesy import EARTH_RADIUS_KM
+
+KM_PER_DEGREE = 111.32
+
+
+def grid_cells(latitude: float, longitude: float, radius_km: float, step: float) -> Tuple[range, list[int]]:
+    """Rows and columns of a `step`-degree grid overlapping the square of half-side `radius_km`.
+
+    Columns wrap at the antimeridian, so they are returned as a list.
+    """
+    columns = round(360.0 / step)
+    d_lat = radius_km / KM_PER_DEGREE
+    d_lon = min(radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6)), 180.0)
+    south = max(latitude - d_lat, -90.0)
+    north = min(latitude + d_lat, 90.0 - 1e-9)
+    rows = range(math.floor(south / step), math.floor(north / step) + 1)
+    first, last = math.floor((longitude - d_lon) / step), math.floor((longitude + d_lon) / step)
+    wrapped = dict.fromkeys(column % columns for column in range(first, min(last, first + columns - 1) + 1))
+    return rows, list(wrapped)
+
+
+def unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """Earth-centred unit vectors, shape ``(3, n)``, for latitudes and longitudes in degrees."""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def arc_km(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Great-circle distance between unit vectors `a` and `b` (broadcasting over axis 1)."""
+    chord = np.sqrt(np.sum((a - b) ** 2, axis=0))
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2.0, 1.0))
+
+
+class FlightIndex:
+    """Flights bucketed on a latitude/longitude grid for radius and nearest queries.
+
+    Built once per feed update. Flights are sorted by grid cell so each cell
+    is a contiguous slice. A query takes any number of observers: the cells
+    overlapping each observer's radius are found and expanded into
+    (observer, flight) candidate pairs, and great-circle distances for all
+    pairs are measured as Earth-centred unit vectors in one vectorized
+    step. `cell_deg` should be around the query radius: 0.1 degrees suits
+    the 15 km aircraft radius.
+    """
+
+    def __init__(self, flights: Iterable[Any], cell_deg: float = 0.1) -> None:
+        located = [
+            flight for flight in flights
+            if getattr(flight, "latitude", None) is not None and getattr(flight, "longitude", None) is not None
+        ]
+        self.cell_deg = cell_deg
+        self._columns = round(360.0 / cell_deg)
+        latitudes = np.array([float(flight.latitude) for flight in located])
+        longitudes = np.array([float(flight.longitude) for flight in located])
+        keys = (
+            np.floor(latitudes / cell_deg).astype(np.int64) * self._columns
+            + np.floor(longitudes / cell_deg).astype(np.int64) % self._columns
+        )
+        order = np.argsort(keys, kind="stable")
+        self.flights = [located[i] for i in order]
+        self._xyz = unit_vectors(latitudes[order], longitudes[order]).reshape(3, -1)
+
+        # Occupied cells, sorted, with the slice of `flights` each one holds.
+        self._cell_keys, self._starts = np.unique(keys[order], return_index=True)
+        self._ends = np.append(self._starts[1:], len(keys))
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def _candidates(self, latitudes: np.ndarray, longitudes: np.ndarray, radius_km: float):
+        """(observer, flight) index pairs for the flights in the cells around each observer.
+
+        The cells are those `grid_cells` returns, worked out for every
+        observer at once on a padded (observer, row, column) grid.
+        """
+        step = self.cell_deg
+        d_lat = radius_km / KM_PER_DEGREE
+        d_lon = np.minimum(radius_km / (KM_PER_DEGREE * np.maximum(np.cos(np.radians(latitudes)), 1e-6)), 180.0)
+        row_first = np.floor(np.maximum(latitudes - d_lat, -90.0) / step).astype(np.int64)
+        row_last = np.floor(np.minimum(latitudes + d_lat, 90.0 - 1e-9) / step).astype(np.int64)
+        column_first = np.floor((longitudes - d_lon) / step).astype(np.int64)
+        column_count = np.minimum(
+            np.floor((longitudes + d_lon) / step).astype(np.int64) - column_first + 1, self._columns,
+        )
+
+        rows = row_first[:, None, None] + np.arange(np.max(row_last - row_first) + 1)[None, :, None]
+        columns = np.arange(np.max(column_count))[None, None, :]
+        used = (rows <= row_last[:, None, None]) & (columns < column_count[:, None, None])
+        keys = (rows * self._columns + (column_first[:, None, None] + columns) % self._columns)[used]
+        observers = np.broadcast_to(np.arange(len(latitudes))[:, None, None], used.shape)[used]
+
+        slot = np.minimum(np.searchsorted(self._cell_keys, keys), len(self._cell_keys) - 1)
+        occupied = self._cell_keys[slot] == keys
+        starts, ends, observers = self._starts[slot[occupied]], self._ends[slot[occupied]], observers[occupied]
+
+        # Expand each cell's [start, end) slice into flight indices.
+        counts = ends - starts
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        flights = np.repeat(starts, counts) + np.arange(first.size) - first
+        return np.repeat(observers, counts), flights
+
+    def _hits(self, latitudes, longitudes, radius_km: float):
+        """(n, observers, flights, distances_km) of hits within `radius_km`, nearest first per observer."""
+        latitudes = np.atleast_1d(np.asarray(latitudes, dtype=float))
+        longitudes = np.atleast_1d(np.asarray(longitudes, dtype=float))
+        if not self.flights:
+            empty = np.empty(0, dtype=np.int64)
+            return len(latitudes), empty, empty, np.empty(0)
+
+        observers, flights = self._candidates(latitudes, longitudes, radius_km)
+        distances = arc_km(unit_vectors(latitudes, longitudes)[:, observers], self._xyz[:, flights])
+        inside = distances <= radius_km
+        observers, flights, distances = observers[inside], flights[inside], distances[inside]
+        order = np.lexsort((flights, distances, observers))
+        return len(latitudes), observers[order], flights[order], distances[order]
+
+    def within(self, latitudes, longitudes, radius_km: float) -> Tuple[list[np.ndarray], list[np.ndarray]]:
+        """For each observer, indices into `flights` within `radius_km` and their distances, nearest first."""
+        n, observers, flights, distances = self._hits(latitudes, longitudes, radius_km)
+        bounds = np.searchsorted(observers, np.arange(n + 1))
+        return (
+            [flights[bounds[i]:bounds[i + 1]] for i in range(n)],
+            [distances[bounds[i]:bounds[i + 1]] for i in range(n)],
+        )
+
+    def nearest(self, latitudes, longitudes, radius_km: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """The `k` flights nearest each observer within `radius_km`.
+
+        Returns (indices, distances_km), both shaped ``(n_observers, k)``;
+        missing neighbours are -1 with an infinite distance.
+        """
+        n, observers, flights, distances = self._hits(latitudes, longitudes, radius_km)
+        indices = np.full((n, k), -1, dtype=np.int64)
+        nearest = np.full((n, k), np.inf)
+        # Rank of each hit among its observer's hits, which are already sorted.
+        rank = np.arange(observers.size) - np.searchsorted(observers, observers)
+        keep = rank < k
+        indices[observers[keep], rank[keep]] = flights[keep]
+        nearest[observers[keep], rank[keep]] = distances[keep]
+        return indices, nearest
@@ -0,0 +1,125 @@
+"""Pointing at terrestrial targets on the WGS84 ellipsoid.
+
+Aircraft are a few kilometres from the observer. Over those distances light
+time, aberration and Earth orientation change the answer by far less than a
+compass can show, so a target's direction is a plain Earth-fixed (ECEF)
+difference rotated into the observer's east/north/up frame.
+
+Every function takes arrays as well as scalars and broadcasts its
+arguments. Many aircraft from many observers is one call, with observer
+arrays shaped ``(n, 1)`` against aircraft arrays shaped ``(m,)``. Vectors
+have their components on the first axis, i.e. shape ``(3, ...)``.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+# WGS84 ellipsoid.
+WGS84_A_M = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+# Mean Earth radius for great-circle distances on a sphere.
+EARTH_RADIUS_KM = 6371.0
+
+
+def _frame(latitude, longitude):
+    lat = np.radians(np.asarray(latitude, dtype=float))
+    lon = np.radians(np.asarray(longitude, dtype=float))
+    return np.sin(lat), np.cos(lat), np.sin(lon), np.cos(lon)
+
+
+def geodetic_to_ecef(latitude, longitude, altitude_m=0.0) -> np.ndarray:
+    """ECEF position in metres of geodetic coordinates (degrees, metres above the ellipsoid)."""
+    sin_lat, cos_lat, sin_lon, cos_lon = _frame(latitude, longitude)
+    altitude_m = np.asarray(altitude_m, dtype=float)
+    # Prime vertical radius of curvature.
+    n = WGS84_A_M / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+    return np.stack(np.broadcast_arrays(
+        (n + altitude_m) * cos_lat * cos_lon,
+        (n + altitude_m) * cos_lat * sin_lon,
+        (n * (1.0 - WGS84_E2) + altitude_m) * sin_lat,
+    ))
+
+
+def ecef_to_enu(vector, latitude, longitude) -> np.ndarray:
+    """Rotate ECEF vectors into the east/north/up frame at `latitude`, `longitude` (degrees)."""
+    x, y, z = vector
+    sin_lat, cos_lat, sin_lon, cos_lon = _frame(latitude, longitude)
+    return np.stack(np.broadcast_arrays(
+        -sin_lon * x + cos_lon * y,
+        -sin_lat * cos_lon * x - sin_lat * sin_lon * y + cos_lat * z,
+        cos_lat * cos_lon * x + cos_lat * sin_lon * y + sin_lat * z,
+    ))
+
+
+def enu_to_ecef(vector, latitude, longitude) -> np.ndarray:
+    """Inverse of `ecef_to_enu`."""
+    east, north, up = vector
+    sin_lat, cos_lat, sin_lon, cos_lon = _frame(latitude, longitude)
+    return np.stack(np.broadcast_arrays(
+        -sin_lon * east - sin_lat * cos_lon * north + cos_lat * cos_lon * up,
+        cos_lon * east - sin_lat * sin_lon * north + cos_lat * sin_lon * up,
+        cos_lat * north + sin_lat * up,
+    ))
+
+
+def topocentric(
+    observer_latitude, observer_longitude, observer_altitude_m,
+    target_latitude, target_longitude, target_altitude_m,
+) -> np.ndarray:
+    """East/north/up position in metres of each target as seen by each observer."""
+    # Broadcast first: the component axis leads, so (3,) and (3, m) would not line up.
+    (
+        observer_latitude, observer_longitude, observer_altitude_m,
+        target_latitude, target_longitude, target_altitude_m,
+    ) = np.broadcast_arrays(
+        observer_latitude, observer_longitude, observer_altitude_m,
+        target_latitude, target_longitude, target_altitude_m,
+    )
+    delta = (
+        geodetic_to_ecef(target_latitude, target_longitude, target_altitude_m)
+        - geodetic_to_ecef(observer_latitude, observer_longitude, observer_altitude_m)
+    )
+    return ecef_to_enu(delta, observer_latitude, observer_longitude)
+
+
+def horizon(enu) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(azimuth, elevation, distance) of east/north/up vectors; degrees and the vectors' unit."""
+    east, north, up = enu
+    horizontal = np.hypot(east, north)
+    azimuth = np.degrees(np.arctan2(east, north)) % 360.0
+    elevation = np.degrees(np.arctan2(up, horizontal))
+    return azimuth, elevation, np.hypot(horizontal, up)
+
+
+def azimuth_elevation_distance(
+    observer_latitude, observer_longitude, observer_altitude_m,
+    target_latitude, target_longitude, target_altitude_m,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Azimuth (deg), elevation (deg) and slant distance (m) of targets seen from observers."""
+    return horizon(topocentric(
+        observer_latitude, observer_longitude, observer_altitude_m,
+        target_latitude, target_longitude, target_altitude_m,
+    ))
+
+
+def great_circle_km(latitude1, longitude1, latitude2, longitude2) -> np.ndarray:
+    """Distance over a spherical Earth, by the haversine formula (exact at short range)."""
+    lat1, lon1 = np.radians(latitude1), np.radians(longitude1)
+    lat2, lon2 = np.radians(latitude2), np.radians(longitude2)
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def destination(latitude, longitude, distance_km, bearing_deg) -> tuple[np.ndarray, np.ndarray]:
+    """(latitude, longitude) reached going `distance_km` along a great circle at `bearing_deg`."""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    bearing = np.radians(bearing_deg)
+    angle = np.asarray(distance_km, dtype=float) / EARTH_RADIUS_KM
+    lat2 = np.arcsin(np.sin(lat1) * np.cos(angle) + np.cos(lat1) * np.sin(angle) * np.cos(bearing))
+    lon2 = lon1 + np.arctan2(
+        np.sin(bearing) * np.sin(angle) * np.cos(lat1),
+        np.cos(angle) - np.sin(lat1) * np.sin(lat2),
+    )
+    return np.degrees(lat2), (np.degrees(lon2) + 180.0) % 360.0 - 180.0
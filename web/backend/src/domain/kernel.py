@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any, Optional
+
+from jplephem.excerpter import write_excerpt
+from skyfield.api import Loader, load_file
+
+from .models import CelestialBody
+
+FULL_FILENAME = "de421.bsp"
+SUBSET_FILENAME = "omnicompass.bsp"
+
+# Skyfield names of every body the calculator points at. `apparent()` also
+# deflects light by the Sun, Jupiter and Saturn; de421 has no planet centres
+# for the latter two, so it falls back to their barycentres, listed here.
+BODY_NAMES = {
+    CelestialBody.SUN: "sun",
+    CelestialBody.MARS: "mars",
+    CelestialBody.VENUS: "venus",
+    CelestialBody.SATURN: "saturn barycenter",
+    CelestialBody.JUPITER: "jupiter barycenter",
+    CelestialBody.MOON: "moon",
+}
+REQUIRED_NAMES = ("earth", *BODY_NAMES.values())
+
+
+def required_segments(kernel: Any) -> set[tuple[int, int]]:
+    """Return the (center, target) pairs needed to reach every required body."""
+    pairs = set()
+    for name in REQUIRED_NAMES:
+        vector = kernel[name]
+        for segment in getattr(vector, "vector_functions", (vector,)):
+            pairs.add((segment.center, segment.target))
+    return pairs
+
+
+def write_subset(kernel: Any, path: str, start_jd: float, end_jd: float) -> str:
+    """Write the required segments of `kernel` between two TDB Julian dates.
+
+    A ``<path>.sha256`` file in ``sha256sum`` format is written alongside so
+    workers can detect a truncated or stale copy. Returns the digest.
+    """
+    wanted = required_segments(kernel)
+    summaries = [
+        (name, values)
+        for name, values in kernel.spk.daf.summaries()
+        # SPK summaries are (start, end, target, center, frame, type, start_i, end_i).
+        if (values[3], values[2]) in wanted
+    ]
+    with open(path, "w+b") as f:
+        write_excerpt(kernel.spk, f, start_jd, end_jd, summaries)
+
+    digest = file_sha256(path)
+    with open(path + ".sha256", "w") as f:
+        f.write(f"{digest}  {os.path.basename(path)}\n")
+    return digest
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def verify_checksum(path: str) -> bool:
+    try:
+        with open(path + ".sha256") as f:
+            expected = f.read().split()[0]
+    except (OSError, IndexError):
+        return False
+    return file_sha256(path) == expected
+
+
+def coverage(kernel: Any) -> tuple[float, float]:
+    """(start, end) TDB Julian dates covered by every segment of `kernel`."""
+    return (
+        max(s.spk_segment.start_jd for s in kernel.segments),
+        min(s.spk_segment.end_jd for s in kernel.segments),
+    )
+
+
+def covers(kernel: Any, jd: float) -> bool:
+    """Whether every segment of `kernel` covers the TDB Julian date `jd`."""
+    start, end = coverage(kernel)
+    return start <= jd <= end
+
+
+def load_kernel(load: Loader, data_dir: str, jd: Optional[float] = None) -> Any:
+    """Load the trimmed kernel if it is intact and covers `jd`, else de421.
+
+    Skyfield opens SPK files through jplephem, which memory-maps segment
+    coefficients read-only. Pages of the kernel are therefore shared between
+    every worker process on the host instead of being copied into each one.
+    """
+    subset = os.path.join(data_dir, SUBSET_FILENAME)
+    if os.path.exists(subset):
+        if not verify_checksum(subset):
+            print(f"Ephemeris subset {subset} failed its checksum, using {FULL_FILENAME}")
+        else:
+            kernel = load_file(subset)
+            if jd is None or covers(kernel, jd):
+                return kernel
+            print(f"Ephemeris subset {subset} does not cover JD {jd:.1f}, using {FULL_FILENAME}")
+            kernel.close()
+    return load(FULL_FILENAME)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
 
@@ -10,11 +10,26 @@ class CelestialBody(str, Enum):
     JUPITER = "JUPITER"
     MOON = "MOON"
 
+class Precision(str, Enum):
+    HIGH = "HIGH"  # skyfield with the JPL kernel
+    LOW = "LOW"    # closed-form series, arc-minute level
+
 class ObserverLocation(BaseModel):
     latitude: float
     longitude: float
     elevation: float = 0.0
 
+class PositionQuery(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    elevation: float = 0.0
+    target: str
+    # Naive times are taken as UTC; omitted means now.
+    time: datetime | None = None
+
+class BulkPositionRequest(BaseModel):
+    rows: list[PositionQuery] = Field(max_length=100_000)
+
 class DirectionUpdate(BaseModel):
     target_id: str
     azimuth: float
@@ -28,3 +43,81 @@ class DirectionUpdate(BaseModel):
     destination_airport: str | None = None
     vertical_speed_mps: float | None = None
     horizontal_distance_km: float | None = None
+    # Motion hints for client-side extrapolation: deg/s and deg/s^2.
+    azimuth_rate: float | None = None
+    altitude_rate: float | None = None
+    azimuth_accel: float | None = None
+    altitude_accel: float | None = None
+
+
+class Direction:
+    """Hot-path form of `DirectionUpdate`.
+
+    A plain slotted record, built and serialized twice a second per group
+    without pydantic validation. Use `to_model` where a validated
+    `DirectionUpdate` is wanted.
+    """
+
+    __slots__ = tuple(DirectionUpdate.model_fields)
+
+    def __init__(
+        self,
+        target_id: str,
+        azimuth: float,
+        altitude: float,
+        distance_km: float,
+        timestamp: datetime,
+        aircraft_altitude_m: float | None = None,
+        ground_speed_kmh: float | None = None,
+        origin_airport: str | None = None,
+        destination_airport: str | None = None,
+        vertical_speed_mps: float | None = None,
+        horizontal_distance_km: float | None = None,
+        azimuth_rate: float | None = None,
+        altitude_rate: float | None = None,
+        azimuth_accel: float | None = None,
+        altitude_accel: float | None = None,
+    ):
+        self.target_id = target_id
+        self.azimuth = azimuth
+        self.altitude = altitude
+        self.distance_km = distance_km
+        self.timestamp = timestamp
+        self.aircraft_altitude_m = aircraft_altitude_m
+        self.ground_speed_kmh = ground_speed_kmh
+        self.origin_airport = origin_airport
+        self.destination_airport = destination_airport
+        self.vertical_speed_mps = vertical_speed_mps
+        self.horizontal_distance_km = horizontal_distance_km
+        self.azimuth_rate = azimuth_rate
+        self.altitude_rate = altitude_rate
+        self.azimuth_accel = azimuth_accel
+        self.altitude_accel = altitude_accel
+
+    def set_rates(self, rates: tuple[float, float, float, float] | None) -> "Direction":
+        """Attach (azimuth_rate, altitude_rate, azimuth_accel, altitude_accel), if known."""
+        if rates is not None:
+            self.azimuth_rate, self.altitude_rate, self.azimuth_accel, self.altitude_accel = rates
+        return self
+
+    def payload(self) -> dict:
+        """JSON-ready fields, leaving out the ones that are None."""
+        payload = {
+            "target_id": self.target_id,
+            "azimuth": self.azimuth,
+            "altitude": self.altitude,
+            "distance_km": self.distance_km,
+            # Same form pydantic uses for UTC datetimes.
+            "timestamp": self.timestamp.isoformat().replace("+00:00", "Z"),
+        }
+        for name in _OPTIONAL_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                payload[name] = value
+        return payload
+
+    def to_model(self) -> DirectionUpdate:
+        return DirectionUpdate(**{name: getattr(self, name) for name in self.__slots__})
+
+
+_OPTIONAL_FIELDS = Direction.__slots__[5:]
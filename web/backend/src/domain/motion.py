@@ -0,0 +1,88 @@
+"""Angular rates of a target as seen by a fixed observer.
+
+Clients extrapolate between updates with the first and second time
+derivatives of azimuth and altitude. Those follow from the target's
+topocentric east/north/up position, velocity and acceleration; this module
+turns Earth-fixed (ITRS) motion into those derivatives.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# Earth's rotation rate about the ITRS z axis, rad/s.
+EARTH_ROTATION_RAD_S = 7.2921150e-5
+
+
+def spin(v: np.ndarray) -> np.ndarray:
+    """Return omega x `v` for Earth's rotation vector; `v` has shape ``(3, ...)``."""
+    return EARTH_ROTATION_RAD_S * np.stack([-v[1], v[0], np.zeros_like(v[0])])
+
+
+def rotating_frame_motion(r: np.ndarray, velocity: np.ndarray | None = None, inertial_acceleration=0.0):
+    """Velocity and acceleration in ITRS of a body at ITRS position `r`.
+
+    `velocity` is its ITRS velocity when known; None treats the body as at
+    rest in inertial space, which holds to a few percent for the Sun, Moon
+    and planets. `inertial_acceleration` is any real force (gravity for a
+    satellite); the Coriolis and centrifugal terms are added here.
+    """
+    if velocity is None:
+        velocity = -spin(r)
+    acceleration = inertial_acceleration - 2.0 * spin(velocity) - spin(spin(r))
+    return velocity, acceleration
+
+
+def enu(vector: np.ndarray, lat: float, lon: float) -> np.ndarray:
+    """Rotate an ITRS vector into the east/north/up frame at `lat`, `lon` (radians)."""
+    x, y, z = vector
+    sin_lat, cos_lat = math.sin(lat), math.cos(lat)
+    sin_lon, cos_lon = math.sin(lon), math.cos(lon)
+    return np.array([
+        -sin_lon * x + cos_lon * y,
+        -sin_lat * cos_lon * x - sin_lat * sin_lon * y + cos_lat * z,
+        cos_lat * cos_lon * x + cos_lat * sin_lon * y + sin_lat * z,
+    ])
+
+
+def _first_rates(p, v) -> tuple[float, float]:
+    e, n, u = p
+    ve, vn, vu = v
+    horizontal2 = e * e + n * n
+    horizontal = math.sqrt(horizontal2)
+    azimuth_rate = (n * ve - e * vn) / horizontal2
+    altitude_rate = (vu * horizontal2 - u * (e * ve + n * vn)) / (horizontal * (horizontal2 + u * u))
+    return math.degrees(azimuth_rate), math.degrees(altitude_rate)
+
+
+def angular_rates(p, v, a, dt: float = 1.0) -> tuple[float, float, float, float] | None:
+    """(azimuth_rate, altitude_rate, azimuth_accel, altitude_accel) in deg/s and deg/s².
+
+    `p`, `v` and `a` are the topocentric east/north/up position, velocity
+    and acceleration, as arrays or sequences, in any consistent length unit.
+    Second derivatives are a central difference of the exact first
+    derivatives `dt` seconds apart.
+    Returns None at the zenith or nadir, where azimuth has no rate.
+    """
+    # Plain floats: three-element arrays cost more in overhead than in arithmetic.
+    p, v, a = ([float(c) for c in vector] for vector in (p, v, a))
+    if p[0] == 0.0 and p[1] == 0.0:
+        return None
+    azimuth_rate, altitude_rate = _first_rates(p, v)
+    half_dt2 = 0.5 * dt * dt
+    ahead = _first_rates(
+        [pi + vi * dt + ai * half_dt2 for pi, vi, ai in zip(p, v, a)],
+        [vi + ai * dt for vi, ai in zip(v, a)],
+    )
+    behind = _first_rates(
+        [pi - vi * dt + ai * half_dt2 for pi, vi, ai in zip(p, v, a)],
+        [vi - ai * dt for vi, ai in zip(v, a)],
+    )
+    # Azimuth rates are unaffected by the 360 wrap, so no unwrapping is needed.
+    return (
+        azimuth_rate,
+        altitude_rate,
+        (ahead[0] - behind[0]) / (2.0 * dt),
+        (ahead[1] - behind[1]) / (2.0 * dt),
+    )
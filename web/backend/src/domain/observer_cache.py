@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Tuple
+
+from skyfield.api import Topos
+
+from .models import ObserverLocation
+
+# Length of one degree of latitude; used to turn a precision in metres into a
+# step in degrees. Longitude uses the same step, which is finer than needed
+# away from the equator but never coarser.
+METERS_PER_DEGREE = 111_320.0
+
+LocationKey = Tuple[int, int, int]
+
+
+def quantize_location(location: ObserverLocation, precision_m: float) -> LocationKey:
+    """Snap a location onto a grid of roughly `precision_m` metres."""
+    step = precision_m / METERS_PER_DEGREE
+    return (
+        round(location.latitude / step),
+        round(location.longitude / step),
+        round(location.elevation / precision_m),
+    )
+
+
+def cell_centre(key: LocationKey, precision_m: float) -> ObserverLocation:
+    """Return the location at the centre of a `quantize_location` cell."""
+    step = precision_m / METERS_PER_DEGREE
+    return ObserverLocation(
+        latitude=key[0] * step,
+        longitude=key[1] * step,
+        elevation=key[2] * precision_m,
+    )
+
+
+class ObserverCache:
+    """Bounded LRU cache of ``earth + Topos`` observers keyed by quantized location.
+
+    Phones report the same position over and over; rebuilding the observer
+    vector sum on every tick is wasted allocation. Locations within
+    `precision_m` of each other share one entry, built from the cell centre so
+    the result does not depend on which connection populated it.
+    """
+
+    def __init__(self, earth: Any, *, precision_m: float = 1.0, maxsize: int = 4096) -> None:
+        self._earth = earth
+        self.precision_m = precision_m
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[LocationKey, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, location: ObserverLocation) -> LocationKey:
+        return quantize_location(location, self.precision_m)
+
+    def get(self, location: ObserverLocation) -> Any:
+        """Return the observer vector sum for `location`, building it on a miss."""
+        key = self.key(location)
+        with self._lock:
+            observer = self._entries.get(key)
+            if observer is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return observer
+            self.misses += 1
+
+        centre = cell_centre(key, self.precision_m)
+        observer = self._earth + Topos(
+            latitude_degrees=centre.latitude,
+            longitude_degrees=centre.longitude,
+            elevation_m=centre.elevation,
+        )
+
+        with self._lock:
+            self._entries[key] = observer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return observer
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from sgp4 import omm
+from sgp4.api import Satrec, SatrecArray
+from skyfield.constants import AU_KM, DAY_S
+from skyfield.framelib import itrs
+from skyfield.functions import T, mxm, mxv
+from skyfield.iokit import parse_tle_file
+from skyfield.sgp4lib import TEME
+
+from .motion import rotating_frame_motion, spin
+
+# Satellite targets are addressed as "SAT:<catalog number>" or "SAT:<name>".
+SATELLITE_PREFIX = "SAT:"
+
+# Earth's gravitational parameter (WGS-84), in AU^3/s^2.
+GM_AU3_S2 = 398600.4418 / AU_KM ** 3
+
+
+class SatelliteCatalog:
+    """Earth satellites from a local TLE or OMM file, propagated together.
+
+    `propagate` runs one vectorized SGP4 call for the whole catalogue per
+    tick, so the per-tick cost stays flat as satellites are added and the
+    result is shared by every observer. Positions are geometric: light time
+    (a few milliseconds) and aberration are ignored, which moves a satellite
+    by a few arcseconds at most.
+
+    The file is re-read when its modification time changes, checked at most
+    every `reload_interval` seconds by `propagate` and `lookup`.
+    """
+
+    def __init__(self, path: str, ts: Any, *, reload_interval: float = 60.0) -> None:
+        self.path = path
+        self._ts = ts
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        mtime = os.path.getmtime(self.path)
+        names, numbers, models = _read_elements(self.path, self._ts)
+        index: dict[str, int] = {}
+        for i, (name, number) in enumerate(zip(names, numbers)):
+            index[str(number)] = i
+            index.setdefault(name, i)
+        # Swapped in one assignment so readers never see a half-loaded catalogue.
+        self._catalogue = (names, numbers, index, models, SatrecArray(models) if models else None)
+        self._mtime = mtime
+        print(f"Loaded {len(names)} satellites from {self.path}")
+
+    def reload_if_changed(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return False
+        with self._lock:
+            self._checked = now
+            try:
+                changed = os.path.getmtime(self.path) != self._mtime
+                if changed:
+                    self._load()
+            except (OSError, ValueError) as exc:
+                print(f"Satellite catalogue reload failed: {exc}")
+                return False
+        return changed
+
+    def __len__(self) -> int:
+        return len(self._catalogue[0])
+
+    def lookup(self, target: str) -> Optional[int]:
+        """Return the catalogue index for a ``SAT:`` target, or None if unknown."""
+        if not target.startswith(SATELLITE_PREFIX):
+            return None
+        self.reload_if_changed()
+        return self._catalogue[2].get(target[len(SATELLITE_PREFIX):])
+
+    def number(self, target: str) -> Optional[int]:
+        """Return the NORAD catalogue number for a ``SAT:`` target, or None if unknown."""
+        i = self.lookup(target)
+        return None if i is None else self._catalogue[1][i]
+
+    def propagate(self, t: Any) -> "SatellitePositions":
+        """Propagate every satellite to `t` and return Earth-fixed positions."""
+        self.reload_if_changed()
+        names, _, index, _, models = self._catalogue
+        if models is None:
+            empty = np.empty((3, 0))
+            return SatellitePositions(names, index, empty, empty, empty)
+
+        jd, fraction = _sgp4_epoch(t)
+        errors, r_teme, v_teme = models.sgp4(np.array([jd]), np.array([fraction]))
+        r_teme = r_teme[:, 0, :].T / AU_KM
+        v_teme = v_teme[:, 0, :].T / AU_KM
+        r_teme[:, errors[:, 0] != 0] = np.nan
+
+        # TEME -> GCRS -> ITRS, the frame EphemerisSnapshot projects from.
+        # TEME is treated as inertial, so the ITRS velocity gains the -omega x r
+        # of Earth's rotation and the acceleration is gravity plus the
+        # rotating-frame terms; both only feed the angular-rate hints.
+        rotation = mxm(itrs.rotation_at(t), T(TEME.rotation_at(t)))
+        r_itrs = rotation @ r_teme
+        gravity = -GM_AU3_S2 * r_itrs / np.sum(r_itrs * r_itrs, axis=0) ** 1.5
+        velocity, acceleration = rotating_frame_motion(r_itrs, rotation @ v_teme - spin(r_itrs), gravity)
+        return SatellitePositions(names, index, r_itrs, velocity, acceleration)
+
+    def positions(self, target: str, t: Any) -> Optional[np.ndarray]:
+        """Earth-fixed positions (AU, shape ``(3, n)``) of one satellite at every instant of `t`."""
+        i = self.lookup(target)
+        if i is None:
+            return None
+        model = self._catalogue[3][i]
+        errors, r_teme, _ = model.sgp4_array(*_sgp4_epoch(t))
+        r_teme = r_teme.T / AU_KM
+        r_teme[:, errors != 0] = np.nan
+        return mxv(mxm(itrs.rotation_at(t), T(TEME.rotation_at(t))), r_teme)
+
+
+def _sgp4_epoch(t: Any) -> Tuple[Any, Any]:
+    """`t` as the (whole, fraction) UTC Julian date SGP4 expects.
+
+    Split the way skyfield's EarthSatellite does it. Skyfield has no public
+    accessor for TAI-UTC at a Time, so this is the one place that uses the
+    private ``Time._leap_seconds()``.
+    """
+    return t.whole, t.tai_fraction - t._leap_seconds() / DAY_S
+
+
+class SatellitePositions:
+    """Earth-fixed satellite positions (AU) for one instant, with lookups by target.
+
+    `velocity` (AU/s) and `acceleration` (AU/s^2) are in the same frame and
+    columns as `itrs_au`.
+    """
+
+    __slots__ = ("names", "_index", "itrs_au", "velocity", "acceleration")
+
+    def __init__(
+        self,
+        names: list[str],
+        index: dict[str, int],
+        itrs_au: np.ndarray,
+        velocity: np.ndarray,
+        acceleration: np.ndarray,
+    ) -> None:
+        self.names = names
+        self._index = index
+        self.itrs_au = itrs_au
+        self.velocity = velocity
+        self.acceleration = acceleration
+
+    def export(self) -> tuple:
+        """(names, index, itrs_au, velocity, acceleration): plain data to rebuild this from."""
+        return self.names, self._index, self.itrs_au, self.velocity, self.acceleration
+
+    def _column(self, target: str) -> Optional[int]:
+        if not target.startswith(SATELLITE_PREFIX):
+            return None
+        return self._index.get(target[len(SATELLITE_PREFIX):])
+
+    def get(self, target: str) -> Optional[Tuple[str, np.ndarray]]:
+        i = self._column(target)
+        if i is None:
+            return None
+        return self.names[i], self.itrs_au[:, i]
+
+    def motion(self, target: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(velocity, acceleration) of a ``SAT:`` target, None if unknown or failed."""
+        i = self._column(target)
+        if i is None or np.isnan(self.itrs_au[0, i]):
+            return None
+        return self.velocity[:, i], self.acceleration[:, i]
+
+
+def _read_elements(path: str, ts: Any) -> Tuple[list[str], list[int], list[Satrec]]:
+    names, numbers, models = [], [], []
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".csv", ".xml"):
+        with open(path) as f:
+            records = omm.parse_csv(f) if extension == ".csv" else omm.parse_xml(f)
+            for fields in records:
+                model = Satrec()
+                omm.initialize(model, fields)
+                names.append(fields.get("OBJECT_NAME") or str(model.satnum))
+                numbers.append(model.satnum)
+                models.append(model)
+    else:
+        with open(path, "rb") as f:
+            for satellite in parse_tle_file(f, ts):
+                names.append(satellite.name or str(satellite.model.satnum))
+                numbers.append(satellite.model.satnum)
+                models.append(satellite.model)
+    return names, numbers, models
@@ -0,0 +1,260 @@
+"""Share ephemeris snapshots between server processes over a Unix socket.
+
+With several uvicorn workers, each one would otherwise compute the same
+body positions every tick. Instead one producer process (``python -m
+src.producer``) computes each tick's snapshots and publishes them; every
+worker's calculator subscribes and only does the per-observer projection.
+
+Frames are a 4-byte big-endian length, then a length-prefixed JSON header
+and the little-endian float64 arrays it lists the shapes of. Decoding one
+can only yield numbers and strings, never objects, and a worker only
+connects to a socket owned by its own user, which the publisher makes
+private to that user.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import stat
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from .models import CelestialBody, Precision
+
+if TYPE_CHECKING:
+    from .calculator import CelestialCalculator
+
+_LENGTH = struct.Struct(">I")
+# Far above a full satellite catalogue; anything larger is not a snapshot.
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+_FLOAT = np.dtype("<f8")
+
+
+def _read_exactly(sock: socket.socket, size: int) -> bytearray:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("snapshot feed closed")
+        data.extend(chunk)
+    return data
+
+
+def _rows(vectors: list, width: int = 3) -> np.ndarray:
+    return np.array(vectors, dtype=float).reshape(-1, width)
+
+
+def encode_frame(payload: dict) -> bytes:
+    """Frame one tick's `export_snapshot` payloads, keyed by tier."""
+    tiers, arrays = [], []
+    for precision, snapshot in payload.items():
+        bodies = list(snapshot["itrs_au"])
+        motion = snapshot["motion"]
+        arrays += [
+            _rows([snapshot["itrs_au"][body] for body in bodies]),
+            _rows([motion[body][0] for body in bodies]),
+            _rows([motion[body][1] for body in bodies]),
+        ]
+        satellites = None
+        if snapshot["satellites"] is not None:
+            names, index, *vectors = snapshot["satellites"]
+            satellites = {"names": names, "index": index}
+            arrays += vectors
+        whole, fraction = snapshot["tt"]
+        tiers.append({
+            "precision": Precision(precision).value,
+            "tt": [float(whole), float(fraction)],
+            "bodies": [body.value for body in bodies],
+            "satellites": satellites,
+        })
+    header = json.dumps({"tiers": tiers, "shapes": [list(array.shape) for array in arrays]}).encode()
+    body = b"".join([_LENGTH.pack(len(header)), header, *(np.ascontiguousarray(a, _FLOAT).tobytes() for a in arrays)])
+    return _LENGTH.pack(len(body)) + body
+
+
+def decode_frame(data: bytearray) -> dict:
+    """Inverse of `encode_frame` (without the outer length); ValueError if malformed."""
+    try:
+        (size,) = _LENGTH.unpack_from(data)
+        header = json.loads(bytes(data[_LENGTH.size:_LENGTH.size + size]))
+        offset = _LENGTH.size + size
+        arrays = []
+        for shape in header["shapes"]:
+            if not all(isinstance(n, int) and n >= 0 for n in shape):
+                raise ValueError(f"bad array shape {shape}")
+            count = int(np.prod(shape))
+            arrays.append(np.frombuffer(data, _FLOAT, count, offset).reshape(shape))
+            offset += count * _FLOAT.itemsize
+        if offset != len(data):
+            raise ValueError(f"{len(data) - offset} trailing bytes")
+
+        arrays = iter(arrays)
+        payload = {}
+        for tier in header["tiers"]:
+            bodies = [CelestialBody(name) for name in tier["bodies"]]
+            positions, velocities, accelerations = next(arrays), next(arrays), next(arrays)
+            satellites = None
+            if tier["satellites"] is not None:
+                satellites = (
+                    tier["satellites"]["names"], tier["satellites"]["index"],
+                    next(arrays), next(arrays), next(arrays),
+                )
+            precision = Precision(tier["precision"])
+            payload[precision] = {
+                "tt": tuple(tier["tt"]),
+                "precision": precision,
+                "itrs_au": dict(zip(bodies, positions)),
+                "satellites": satellites,
+                "motion": {body: (velocities[i], accelerations[i]) for i, body in enumerate(bodies)},
+            }
+        return payload
+    except (struct.error, KeyError, TypeError, StopIteration, IndexError) as exc:
+        raise ValueError(f"malformed snapshot frame: {exc!r}") from exc
+
+
+def read_frame(sock: socket.socket) -> dict:
+    (size,) = _LENGTH.unpack(_read_exactly(sock, _LENGTH.size))
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"snapshot frame of {size} bytes")
+    return decode_frame(_read_exactly(sock, size))
+
+
+def check_socket(path: str) -> None:
+    """Refuse a feed socket that another user could have put there."""
+    info = os.stat(path)
+    if not stat.S_ISSOCK(info.st_mode):
+        raise PermissionError(f"{path} is not a socket")
+    if info.st_uid != os.geteuid():
+        raise PermissionError(f"{path} is owned by uid {info.st_uid}, not {os.geteuid()}")
+
+
+class SnapshotPublisher:
+    """Computes a snapshot per tick and sends it to every connected worker."""
+
+    def __init__(
+        self,
+        calculator: "CelestialCalculator",
+        path: str,
+        *,
+        interval: float = 0.5,
+        precisions: tuple[Precision, ...] = (Precision.HIGH, Precision.LOW),
+        send_timeout: float = 1.0,
+    ) -> None:
+        self._calculator = calculator
+        self.path = path
+        self.interval = interval
+        self.precisions = precisions
+        self.send_timeout = send_timeout
+        self._subscribers: list[socket.socket] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.ticks = 0
+
+    def _accept(self, server: socket.socket) -> None:
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                return  # closed by stop()
+            connection.settimeout(self.send_timeout)
+            with self._lock:
+                self._subscribers.append(connection)
+            print(f"Snapshot subscriber connected ({len(self._subscribers)} total)")
+
+    def publish(self, now: float) -> int:
+        """Compute every tier at POSIX time `now` and send it; returns the subscriber count."""
+        payload = {
+            precision: self._calculator.export_snapshot(self._calculator.current_snapshot(precision, now))
+            for precision in self.precisions
+        }
+        frame = encode_frame(payload)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for connection in subscribers:
+            try:
+                connection.sendall(frame)
+            except OSError:
+                # Too slow or gone: it reconnects and falls back to local work meanwhile.
+                connection.close()
+                with self._lock:
+                    self._subscribers.remove(connection)
+        self.ticks += 1
+        return len(subscribers)
+
+    def serve_forever(self) -> None:
+        """Publish every `interval` seconds until `stop`."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        # Only this user's workers may connect.
+        os.chmod(self.path, 0o600)
+        server.listen()
+        threading.Thread(target=self._accept, args=(server,), daemon=True, name="feed-accept").start()
+        print(f"Publishing snapshots on {self.path} every {self.interval} s")
+
+        try:
+            next_tick = time.monotonic()
+            while not self._stopped.is_set():
+                self.publish(time.time())
+                next_tick += self.interval
+                delay = next_tick - time.monotonic()
+                if delay < 0:
+                    next_tick = time.monotonic()
+                    delay = 0.0
+                self._stopped.wait(delay)
+        finally:
+            server.close()
+            with self._lock:
+                subscribers, self._subscribers = self._subscribers, []
+            for connection in subscribers:
+                connection.close()
+
+    def stop(self) -> None:
+        """Make `serve_forever` close the socket and every subscriber, and return."""
+        self._stopped.set()
+
+
+class SnapshotSubscriber:
+    """Background thread feeding published snapshots into a calculator.
+
+    Runs as a thread rather than on the event loop so process-pool workers,
+    which have no loop, can subscribe the same way. While disconnected the
+    calculator's shared snapshots go stale and it computes its own; a feed
+    that closes, or sends a frame that does not decode, is reconnected after
+    `reconnect_delay`.
+    """
+
+    def __init__(self, calculator: "CelestialCalculator", path: str, *, reconnect_delay: float = 1.0) -> None:
+        self._calculator = calculator
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self.received = 0
+        self.connected = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True, name="snapshot-feed")
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                check_socket(self.path)
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(self.path)
+                    self.connected = True
+                    while True:
+                        for payload in read_frame(sock).values():
+                            self._calculator.adopt_snapshot(payload)
+                        self.received += 1
+            except (OSError, ValueError) as exc:
+                if self.connected:
+                    print(f"Snapshot feed lost: {exc}")
+                self.connected = False
+            time.sleep(self.reconnect_delay)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from .models import CelestialBody, ObserverLocation
+from .motion import angular_rates
+from .observer_cache import LocationKey, ObserverCache
+
+if TYPE_CHECKING:
+    from .calculator import CelestialCalculator
+
+ARCSEC = math.pi / (180.0 * 3600.0)
+
+
+class TrajectorySegment:
+    """Chebyshev fit of one body's topocentric east/north/up vector over a window.
+
+    Fitting the Cartesian vector rather than altitude and azimuth keeps the
+    fit smooth through azimuth wrap-around and near the zenith; angles and
+    distance are recovered from the evaluated vector.
+    """
+
+    __slots__ = ("start", "end", "_half", "_coefficients", "_velocity", "_acceleration")
+
+    def __init__(self, start: float, end: float, coefficients: np.ndarray) -> None:
+        self.start = start
+        self.end = end
+        self._half = (end - start) / 2.0
+        # Derivatives with respect to time (per second), fitted once here
+        # rather than on every update.
+        velocity = chebyshev.chebder(coefficients, 1, axis=1) / self._half
+        acceleration = chebyshev.chebder(velocity, 1, axis=1) / self._half
+        # Stored as plain floats, highest order first, for the Clenshaw loop.
+        self._coefficients = _clenshaw_series(coefficients)
+        self._velocity = _clenshaw_series(velocity)
+        self._acceleration = _clenshaw_series(acceleration)
+
+    def covers(self, when: float) -> bool:
+        return self.start <= when < self.end
+
+    def evaluate(self, when: float) -> Tuple[float, float, float]:
+        """Return (altitude, azimuth, distance_km) at POSIX time `when`."""
+        x = (when - self.start) / self._half - 1.0
+        return _horizon([_clenshaw(c, x, 2.0 * x) for c in self._coefficients])
+
+    def evaluate_with_rates(
+        self, when: float,
+    ) -> Tuple[float, float, float, Optional[Tuple[float, float, float, float]]]:
+        """`evaluate` plus the angular rates and accelerations (deg/s, deg/s^2)."""
+        x = (when - self.start) / self._half - 1.0
+        x2 = 2.0 * x
+        position = [_clenshaw(c, x, x2) for c in self._coefficients]
+        rates = angular_rates(
+            position,
+            [_clenshaw(c, x, x2) for c in self._velocity],
+            [_clenshaw(c, x, x2) for c in self._acceleration],
+        )
+        return (*_horizon(position), rates)
+
+
+def _horizon(enu: list) -> Tuple[float, float, float]:
+    east, north, up = enu
+    altitude = math.degrees(math.atan2(up, math.hypot(east, north)))
+    azimuth = math.degrees(math.atan2(east, north)) % 360.0
+    return altitude, azimuth, math.sqrt(east * east + north * north + up * up)
+
+
+def _clenshaw_series(coefficients: np.ndarray) -> list:
+    return [[float(c) for c in row[::-1]] for row in coefficients]
+
+
+def _clenshaw(coefficients: list, x: float, x2: float) -> float:
+    b1 = b2 = 0.0
+    for c in coefficients[:-1]:
+        b1, b2 = c + x2 * b1 - b2, b1
+    return coefficients[-1] + x * b1 - b2
+
+
+class TrajectoryCache:
+    """Per-(observer, body) interpolated trajectories for celestial targets.
+
+    A full skyfield ``observe().apparent().altaz()`` is run for the nodes of a
+    new segment only when the previous one expires or the observer moves to a
+    different cell; every other tick is a few multiplies.
+
+    Error bound: each segment is checked against the exact path at the
+    Chebyshev extrema of the window (where the interpolation error of a smooth
+    path peaks) and at both ends. If the angular error at any check point
+    exceeds `max_error_arcsec`, the window is halved and the fit repeated, so
+    the served direction stays within `max_error_arcsec` (1 arcsecond by
+    default) of the exact path. Observers are snapped to cells of
+    `precision_m`; 100 m moves the Moon by under 0.06 arcseconds.
+    """
+
+    def __init__(
+        self,
+        calculator: CelestialCalculator,
+        *,
+        window: float = 600.0,
+        degree: int = 5,
+        max_error_arcsec: float = 1.0,
+        precision_m: float = 100.0,
+        maxsize: int = 4096,
+    ) -> None:
+        self._calculator = calculator
+        self.window = window
+        self.degree = degree
+        self.max_error_arcsec = max_error_arcsec
+        self.observers = ObserverCache(calculator.earth, precision_m=precision_m, maxsize=maxsize)
+        self.maxsize = maxsize
+        self.fits = 0
+        self._segments: OrderedDict[Tuple[LocationKey, CelestialBody], TrajectorySegment] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def position(
+        self,
+        location: ObserverLocation,
+        target: CelestialBody,
+        now: Optional[float] = None,
+    ) -> Tuple[float, float, float, datetime]:
+        """Return (altitude, azimuth, distance_km, timestamp) at POSIX time `now`."""
+        if now is None:
+            now = time.time()
+        altitude, azimuth, distance_km = self._segment(location, target, now).evaluate(now)
+        return altitude, azimuth, distance_km, datetime.fromtimestamp(now, timezone.utc)
+
+    def position_and_rates(
+        self,
+        location: ObserverLocation,
+        target: CelestialBody,
+        now: float,
+    ) -> Tuple[float, float, float, datetime, Optional[Tuple[float, float, float, float]]]:
+        """`position` plus the angular rates of `target`, from a single segment lookup."""
+        altitude, azimuth, distance_km, rates = self._segment(location, target, now).evaluate_with_rates(now)
+        return altitude, azimuth, distance_km, datetime.fromtimestamp(now, timezone.utc), rates
+
+    def _segment(self, location: ObserverLocation, target: CelestialBody, now: float) -> TrajectorySegment:
+        key = (self.observers.key(location), target)
+
+        with self._lock:
+            segment = self._segments.get(key)
+            if segment is not None:
+                self._segments.move_to_end(key)
+
+        if segment is None or not segment.covers(now):
+            segment = self._fit(self.observers.get(location), target, now)
+            with self._lock:
+                self._segments[key] = segment
+                self._segments.move_to_end(key)
+                while len(self._segments) > self.maxsize:
+                    self._segments.popitem(last=False)
+        return segment
+
+    def _fit(self, observer: Any, target: CelestialBody, start: float) -> TrajectorySegment:
+        n = self.degree + 1
+        nodes = np.cos(np.pi * (np.arange(n) + 0.5) / n)
+        checks = np.cos(np.pi * np.arange(n + 1) / n)
+        window = self.window
+
+        while True:
+            half = window / 2.0
+            offsets = half * (np.concatenate([nodes, checks]) + 1.0)
+            exact = self._exact_enu(observer, target, start, offsets)
+            fitted, expected = exact[:, :n], exact[:, n:]
+            coefficients = chebyshev.chebfit(nodes, fitted.T, self.degree).T
+            segment = TrajectorySegment(start, start + window, coefficients)
+            self.fits += 1
+
+            predicted = chebyshev.chebval(checks, coefficients.T)
+            if _max_angle(predicted, expected) <= self.max_error_arcsec * ARCSEC or window <= 1.0:
+                return segment
+            window = half
+
+    def _exact_enu(self, observer: Any, target: CelestialBody, start: float, offsets: np.ndarray) -> np.ndarray:
+        d = datetime.fromtimestamp(start, timezone.utc)
+        t = self._calculator.ts.utc(
+            d.year, d.month, d.day, d.hour, d.minute,
+            d.second + d.microsecond / 1e6 + offsets,
+        )
+        alt, az, distance = observer.at(t).observe(self._calculator.body(target)).apparent().altaz()
+        horizontal = distance.km * np.cos(alt.radians)
+        return np.array([
+            horizontal * np.sin(az.radians),
+            horizontal * np.cos(az.radians),
+            distance.km * np.sin(alt.radians),
+        ])
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+
+def _max_angle(a: np.ndarray, b: np.ndarray) -> float:
+    cross = np.linalg.norm(np.cross(a.T, b.T), axis=1)
+    dot = np.einsum("ij,ij->j", a, b)
+    return float(np.max(np.arctan2(cross, dot)))
@@ -1,17 +1,125 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from .domain.calculator import CelestialCalculator
-from .api.websocket_handler import WebSocketHandler
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from .config import Settings
+from .domain.models import BulkPositionRequest
+from .metrics import CONTENT_TYPE, REGISTRY, monitor_event_loop
+import asyncio
+import time
 
-app = FastAPI()
-# Initialize calculator on startup to load data once
-calculator = CelestialCalculator()
-ws_handler = WebSocketHandler(calculator)
+settings = Settings.from_env()
+
+
+class StartupTimer:
+    """Records how long each startup phase took, in milliseconds."""
+
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.timings[phase] = round((now - self._last) * 1000, 1)
+        self._last = now
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    timer = StartupTimer()
+    # skyfield and the domain modules are imported here rather than at module
+    # level so importing the app (and spawning workers) stays cheap.
+    from .domain.calculator import CelestialCalculator
+    from .api.executor import CalculationExecutor
+    from .domain.aircraft_feed import AircraftFeed
+    from .api.send_policy import ChangeThresholds
+    from .api.websocket_handler import WebSocketHandler
+    timer.mark("imports")
+
+    # Initialize calculator on startup to load data once
+    calculator_options = {
+        # Interpolated trajectories recompute the ephemeris locally; with a
+        # shared feed, projecting its snapshots is both cheaper and consistent.
+        "trajectory_window": None if settings.snapshot_feed else settings.trajectory_window,
+        "precision": settings.precision,
+        "tle_path": settings.tle_file,
+        "snapshot_feed": settings.snapshot_feed,
+    }
+    calculator = CelestialCalculator(**calculator_options)
+    timer.mark("ephemeris")
+
+    executor = None
+    if settings.executor:
+        executor = CalculationExecutor(
+            calculator,
+            kind=settings.executor,
+            workers=settings.executor_workers,
+            queue_depth=settings.executor_queue_depth,
+            calculator_options=calculator_options,
+        )
+        executor.start()
+        timer.mark("executor")
+
+    thresholds = ChangeThresholds(
+        angle_deg=settings.push_angle_deg,
+        distance_fraction=settings.push_distance_fraction,
+        keyframe_interval=settings.push_keyframe_interval,
+    )
+    ws_handler = WebSocketHandler(
+        calculator,
+        executor=executor,
+        thresholds=thresholds,
+        max_send_lag=settings.max_send_lag,
+        inbound_rate=settings.inbound_rate,
+        inbound_burst=settings.inbound_burst,
+        aircraft_feed=AircraftFeed(tile_deg=settings.aircraft_tile_deg, max_age=settings.aircraft_max_age),
+    )
+    if settings.prewarm:
+        ws_handler.prewarm()
+        timer.mark("prewarm")
+
+    ws_handler.register_metrics(REGISTRY)
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+
+    app.state.calculator = calculator
+    app.state.ws_handler = ws_handler
+    app.state.startup_timings = timer.timings
+    print(f"Startup phases (ms): {timer.timings}")
+    yield
+
+    loop_monitor.cancel()
+    ws_handler.shutdown()
+    if executor is not None:
+        executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/")
 async def root():
     return {"message": "Omni-Compass Backend Running"}
 
+@app.get("/ready")
+async def ready():
+    return {"ready": True, "startup_ms": app.state.startup_timings}
+
+@app.get("/connections")
+async def connections():
+    return {"connections": app.state.ws_handler.connection_stats()}
+
+@app.get("/metrics")
+async def metrics():
+    """This worker's metrics in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.post("/positions")
+async def positions(request: BulkPositionRequest):
+    """Directions for many (observer, target, time) rows, streamed as NDJSON."""
+    from .api.bulk import stream_positions
+    return StreamingResponse(
+        stream_positions(app.state.calculator, request.rows),
+        media_type="application/x-ndjson",
+    )
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await ws_handler.handle_connection(websocket)
-
+    await app.state.ws_handler.handle_connection(websocket)
@@ -0,0 +1,160 @@
+"""Process-local metrics in the Prometheus text exposition format.
+
+Timings are recorded into module-level histograms by the code paths they
+measure; counters and gauges that already live on service objects (caches,
+scheduler, executor) are read when `/metrics` is scraped. Each uvicorn
+worker keeps its own numbers, so scrape workers individually or sum them.
+
+This is a small subset of what ``prometheus_client`` offers, kept in-tree
+so the service has no extra dependency: histograms without labels, and
+callback gauges and counters.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from tens of microseconds (serialization) to seconds (upstream fetches).
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._upper = tuple(sorted(buckets))
+        # One slot per bucket plus the +Inf overflow; made cumulative on render.
+        self._counts = [0] * (len(self._upper) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._upper, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for upper, count in zip(self._upper + (float("inf"),), self._counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_number(upper)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_number(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class Gauge:
+    """A value read from `read` at scrape time; `kind` "counter" for monotonic totals."""
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float], kind: str = "gauge") -> None:
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.kind = kind
+
+    def render(self) -> list[str]:
+        try:
+            value = self.read()
+        except Exception:
+            # A gauge whose owner went away is left out rather than failing the scrape.
+            return []
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            f"{self.name} {_number(value)}",
+        ]
+
+
+class MetricsRegistry:
+    """Named metrics rendered together; registering a name again replaces it."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Histogram | Gauge] = {}
+
+    def histogram(self, name: str, documentation: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = self._metrics[name] = Histogram(name, documentation, buckets)
+        return metric
+
+    def gauge(self, name: str, documentation: str, read: Callable[[], float]) -> Gauge:
+        metric = self._metrics[name] = Gauge(name, documentation, read)
+        return metric
+
+    def counter(self, name: str, documentation: str, read: Callable[[], float]) -> Gauge:
+        metric = self._metrics[name] = Gauge(name, documentation, read, kind="counter")
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CALCULATION_SECONDS = REGISTRY.histogram(
+    "omnicompass_calculation_seconds",
+    "Time to compute one celestial or satellite update for a subscription group.",
+)
+EXECUTOR_QUEUE_SECONDS = REGISTRY.histogram(
+    "omnicompass_executor_queue_seconds",
+    "Time a calculation waited for a free executor worker.",
+)
+AIRCRAFT_DIRECTION_SECONDS = REGISTRY.histogram(
+    "omnicompass_aircraft_direction_seconds",
+    "Time to point at the tracked aircraft from one observer.",
+)
+AIRCRAFT_FETCH_SECONDS = REGISTRY.histogram(
+    "omnicompass_aircraft_fetch_seconds",
+    "Time taken by one FlightRadar24 flight query.",
+)
+SERIALIZATION_SECONDS = REGISTRY.histogram(
+    "omnicompass_serialization_seconds",
+    "Time to encode one update frame.",
+)
+SEND_SECONDS = REGISTRY.histogram(
+    "omnicompass_send_seconds",
+    "Time spent writing one frame to a WebSocket.",
+)
+EVENT_LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "omnicompass_event_loop_lag_seconds",
+    "How late the event loop woke a sleeping monitor task.",
+)
+
+
+async def monitor_event_loop(interval: float = 0.25, histogram: Optional[Histogram] = None) -> None:
+    """Record event-loop lag until cancelled.
+
+    Sleeps `interval` seconds at a time; anything past that before the task
+    runs again is time the loop spent on other work (or blocked).
+    """
+    histogram = histogram or EVENT_LOOP_LAG_SECONDS
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        histogram.observe(max(0.0, loop.time() - started - interval))
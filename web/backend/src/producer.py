@@ -0,0 +1,26 @@
+"""Snapshot producer for multi-worker deployments.
+
+Run once per host next to the uvicorn workers, with the same
+``OMNICOMPASS_*`` environment:
+
+    python -m src.producer
+
+Workers started with ``OMNICOMPASS_SNAPSHOT_FEED`` set to the same socket path
+take their per-tick snapshots from it instead of computing them.
+"""
+from .config import Settings
+from .domain.calculator import CelestialCalculator
+from .domain.snapshot_feed import SnapshotPublisher
+
+
+def main():
+    settings = Settings.from_env()
+    if not settings.snapshot_feed:
+        raise SystemExit("Set OMNICOMPASS_SNAPSHOT_FEED to the socket path to publish on")
+    calculator = CelestialCalculator(precision=settings.precision, tle_path=settings.tle_file)
+    calculator.prewarm()
+    SnapshotPublisher(calculator, settings.snapshot_feed).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
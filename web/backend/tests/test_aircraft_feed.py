@@ -0,0 +1,59 @@
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+# Add the backend root to path so the domain package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.domain.aircraft_feed import AircraftFeed
+from src.domain.flight_index import FlightIndex
+
+
+class CountingFeed(AircraftFeed):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.queries = []
+        self.fail = False
+
+    def fetch_tile(self, north, south, west, east):
+        self.queries.append((north, south, west, east))
+        time.sleep(0.05)
+        if self.fail:
+            raise ConnectionError("rate limited")
+        return [SimpleNamespace(id=f"{south},{west}", latitude=south + 0.5, longitude=west + 0.5)]
+
+
+def test_tiles_cover_radius_and_wrap_at_antimeridian():
+    feed = AircraftFeed(tile_deg=1.0)
+
+    assert feed.tiles_around(59.5, 10.5, 15.0) == [(59, 10)]
+    assert len(feed.tiles_around(59.99, 10.99, 15.0)) == 4
+    tiles = feed.tiles_around(0.2, 179.9, 15.0)
+    assert {column for _, column in tiles} == {179, 180}
+    assert feed.bounds((0, 180)) == (1.0, 0.0, -180.0, -179.0)
+
+
+def test_trackers_share_one_query_per_tile():
+    feed = CountingFeed(tile_deg=1.0, max_age=10.0, retry_delay=5.0)
+
+    async def scenario():
+        # Many observers in one city at once: a single upstream query.
+        results = await asyncio.gather(*(feed.flights_near(59.5 + i * 1e-3, 10.5, 15.0) for i in range(50)))
+        assert all([flight.id for flight in flights] == ["59.0,10.0"] for flights in results)
+        assert len(feed.queries) == 1
+
+        assert (await feed.nearest(59.45, 10.45, 15.0)).id == "59.0,10.0"
+        assert await feed.nearest(59.2, 10.5, 15.0) is None
+        assert len(feed.queries) == 1
+
+        # A failure keeps the last flights and is not retried straight away.
+        stale = SimpleNamespace(id="stale", latitude=59.5, longitude=10.5)
+        feed._tiles[(59, 10)] = (time.monotonic() - 60.0, time.monotonic(), FlightIndex([stale]))
+        feed.fail = True
+        assert await feed.flights_near(59.5, 10.5, 15.0) == [stale]
+        assert await feed.nearest(59.5, 10.5, 15.0) is stale
+        assert len(feed.queries) == 2 and feed.failures == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import sys
+
+# Add the backend root to path so the api package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api import bulk
+from src.domain.calculator import CelestialCalculator
+from src.domain.models import PositionQuery
+
+
+def test_stream_positions_keeps_order_across_chunks(monkeypatch):
+    monkeypatch.setattr(bulk, "CHUNK_ROWS", 3)
+    calc = CelestialCalculator()
+    rows = [
+        PositionQuery(latitude=59.91, longitude=10.75, target=target, time=f"2025-01-01T0{i}:00:00")
+        for i, target in enumerate(["SUN", "MOON", "PLUTO", "SUN", "MARS"])
+    ]
+
+    async def collect():
+        return [chunk async for chunk in bulk.stream_positions(calc, rows)]
+
+    chunks = asyncio.run(collect())
+    lines = [json.loads(line) for chunk in chunks for line in chunk.decode().splitlines()]
+
+    assert len(chunks) == 2
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+    assert "error" in lines[2]
+    assert lines[3]["target_id"] == "SUN"
+    assert lines[3]["timestamp"] == "2025-01-01T03:00:00Z"
+    # Same body, different hours: the Sun has moved.
+    assert lines[0]["azimuth"] != lines[3]["azimuth"]
+
+
+def test_rows_outside_the_ephemeris_get_errors():
+    calc = CelestialCalculator()
+    start, end = calc.ephemeris_range
+    before = calc.ts.tdb_jd(start - 30).utc_datetime().replace(tzinfo=None).isoformat()
+    after = calc.ts.tdb_jd(end + 30).utc_datetime().replace(tzinfo=None).isoformat()
+    rows = [
+        PositionQuery(latitude=59.91, longitude=10.75, target="MOON", time=when)
+        for when in ("2025-01-01T00:00:00", after, "2025-06-01T00:00:00", before)
+    ] + [PositionQuery(latitude=59.91, longitude=10.75, target="MARS", time=after)]
+
+    lines = [json.loads(line) for line in bulk._compute_chunk(calc, rows, 0).decode().splitlines()]
+
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+    assert "azimuth" in lines[0] and "azimuth" in lines[2]
+    for i in (1, 3, 4):
+        assert "ephemeris range" in lines[i]["error"]
+
+
+
+def test_offsets_are_reported_in_utc_and_vanished_satellites_are_errors(monkeypatch):
+    calc = CelestialCalculator()
+    rows = [PositionQuery(latitude=59.91, longitude=10.75, target="SUN", time="2025-01-01T13:00:00+01:00")]
+    (line,) = bulk._compute_chunk(calc, rows, 0).decode().splitlines()
+    assert json.loads(line)["timestamp"] == "2025-01-01T12:00:00Z"
+
+    # As if a catalogue reload dropped the satellite after it was resolved.
+    rows.append(PositionQuery(latitude=59.91, longitude=10.75, target="SAT:25544"))
+    monkeypatch.setattr(bulk, "_resolve_target", lambda calculator, target_id: target_id)
+    monkeypatch.setattr(calc, "calculate_rows", lambda *args: None)
+
+    lines = [json.loads(line) for line in bulk._compute_chunk(calc, rows[1:], 0).decode().splitlines()]
+    assert lines == [{"index": 0, "error": "Target 'SAT:25544' is not supported."}]
@@ -1,12 +1,14 @@
 import pytest
+import numpy as np
 import sys
 import os
+from datetime import datetime, timezone
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../src'))
 
 from domain.calculator import CelestialCalculator
-from domain.models import ObserverLocation, CelestialBody
+from domain.models import ObserverLocation, CelestialBody, Precision
 
 def test_calculator_initialization():
     calc = CelestialCalculator()
@@ -43,3 +45,277 @@ def test_calculate_moon_position():
     assert 0 <= update.azimuth <= 360
     assert -90 <= update.altitude <= 90
 
+
+def test_snapshot_shared_within_tick():
+    calc = CelestialCalculator(snapshot_interval=60.0)
+    oslo = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+    cape_town = ObserverLocation(latitude=-33.92, longitude=18.42, elevation=10)
+
+    first = calc.calculate_position(oslo, CelestialBody.MOON)
+    second = calc.calculate_position(cape_town, CelestialBody.MOON)
+
+    assert calc.current_snapshot() is calc.current_snapshot()
+    assert first.timestamp == second.timestamp
+    # Lunar parallax between the two sites is large, so they must not match.
+    assert first.azimuth != second.azimuth
+
+def test_snapshot_matches_full_observe():
+    from skyfield.api import Topos
+
+    calc = CelestialCalculator()
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=120)
+    snapshot = calc.snapshot()
+    observer = calc.earth + Topos(latitude_degrees=59.91, longitude_degrees=10.75, elevation_m=120)
+
+    for body in (CelestialBody.MOON, CelestialBody.SUN, CelestialBody.SATURN):
+        update = calc.calculate_position(location, body, snapshot=snapshot)
+        alt, az, _ = observer.at(snapshot.t).observe(calc._bodies[body]).apparent().altaz()
+        assert update.altitude == pytest.approx(alt.degrees, abs=1 / 3600)
+        assert update.azimuth == pytest.approx(az.degrees, abs=1 / 3600)
+
+def test_calculate_positions_matches_scalar():
+    calc = CelestialCalculator()
+    snapshot = calc.snapshot()
+    latitudes = np.array([59.91, -33.92, 0.0])
+    longitudes = np.array([10.75, 18.42, -75.0])
+    elevations = np.array([0.0, 10.0, 2500.0])
+    targets = [CelestialBody.SUN, CelestialBody.MOON]
+
+    alt, az, distance = calc.calculate_positions(latitudes, longitudes, elevations, targets, snapshot=snapshot)
+
+    assert alt.shape == az.shape == distance.shape == (2, 3)
+    for i, target in enumerate(targets):
+        for j in range(3):
+            location = ObserverLocation(latitude=latitudes[j], longitude=longitudes[j], elevation=elevations[j])
+            update = calc.calculate_position(location, target, snapshot=snapshot)
+            # The scalar path snaps observers to 1 m cells, tilting the horizon by up to ~5e-6 degrees.
+            assert alt[i, j] == pytest.approx(update.altitude, abs=1e-5)
+            assert az[i, j] == pytest.approx(update.azimuth, abs=1e-5)
+            assert distance[i, j] == pytest.approx(update.distance_km)
+
+def test_observer_cache_reuses_nearby_locations():
+    calc = CelestialCalculator(observer_precision_m=1.0)
+    here = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+    nudged = ObserverLocation(latitude=59.910001, longitude=10.750001, elevation=0.2)
+    elsewhere = ObserverLocation(latitude=59.92, longitude=10.75, elevation=0)
+
+    assert calc.observers.get(here) is calc.observers.get(nudged)
+    assert calc.observers.get(elsewhere) is not calc.observers.get(here)
+    assert calc.observers.hits == 2
+    assert calc.observers.misses == 2
+
+def test_observer_cache_evicts_least_recently_used():
+    calc = CelestialCalculator(observer_cache_size=2)
+    a = ObserverLocation(latitude=10.0, longitude=10.0)
+    b = ObserverLocation(latitude=20.0, longitude=20.0)
+    c = ObserverLocation(latitude=30.0, longitude=30.0)
+
+    first_a = calc.observers.get(a)
+    calc.observers.get(b)
+    calc.observers.get(a)
+    calc.observers.get(c)  # evicts b, the least recently used
+
+    assert len(calc.observers) == 2
+    assert calc.observers.get(a) is first_a
+    misses = calc.observers.misses
+    calc.observers.get(b)
+    assert calc.observers.misses == misses + 1
+
+def test_trajectory_matches_exact_path():
+    calc = CelestialCalculator(trajectory_window=600.0)
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=30)
+    start = calc.ts.now().utc_datetime().timestamp()
+
+    for offset in (0.0, 137.5, 421.0, 599.0):
+        alt, az, distance, timestamp = calc.trajectories.position(location, CelestialBody.MOON, now=start + offset)
+        observer = calc.trajectories.observers.get(location)
+        t = calc.ts.from_datetime(timestamp)
+        exact_alt, exact_az, exact_distance = observer.at(t).observe(calc.moon).apparent().altaz()
+
+        assert alt == pytest.approx(exact_alt.degrees, abs=1 / 3600)
+        assert az == pytest.approx(exact_az.degrees, abs=1 / 3600)
+        assert distance == pytest.approx(exact_distance.km, rel=1e-6)
+
+    # The whole window is served from the segment fitted on the first call.
+    assert len(calc.trajectories) == 1
+
+def test_ephemeris_subset_matches_full_kernel(tmp_path):
+    from domain.kernel import verify_checksum, write_subset
+
+    calc = CelestialCalculator()
+    now = calc.ts.now().tdb
+    path = str(tmp_path / "subset.bsp")
+    write_subset(calc.planets, path, now - 2, now + 2)
+    assert verify_checksum(path)
+
+    subset = CelestialCalculator(ephemeris=path)
+    assert len(subset.planets.segments) < len(calc.planets.segments)
+
+    snapshot_t = calc.ts.now()
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+    for body in CelestialBody:
+        full = calc.calculate_position(location, body, snapshot=calc.snapshot(snapshot_t))
+        trimmed = subset.calculate_position(location, body, snapshot=subset.snapshot(snapshot_t))
+        assert trimmed.azimuth == pytest.approx(full.azimuth, abs=1e-9)
+        assert trimmed.altitude == pytest.approx(full.altitude, abs=1e-9)
+
+    with open(path, "r+b") as f:
+        f.seek(-8, 2)
+        f.write(b"\0" * 8)
+    assert not verify_checksum(path)
+
+def test_low_precision_tier_within_arcminutes():
+    calc = CelestialCalculator()
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+    t = calc.ts.now()
+    high = calc.snapshot(t, Precision.HIGH)
+    low = calc.snapshot(t, Precision.LOW)
+
+    for body in CelestialBody:
+        exact = calc.calculate_position(location, body, snapshot=high)
+        approx = calc.calculate_position(location, body, snapshot=low)
+        d_az = (approx.azimuth - exact.azimuth + 180) % 360 - 180
+        error_deg = np.hypot(d_az * np.cos(np.radians(exact.altitude)), approx.altitude - exact.altitude)
+        # Documented peaks are ≲5′ for the Moon and under 4′ otherwise; the
+        # bound leaves room for peaks the documented sampling missed.
+        assert error_deg * 60 < (6.0 if body == CelestialBody.MOON else 5.0), body
+        assert approx.distance_km == pytest.approx(exact.distance_km, rel=0.01)
+
+def test_precision_selectable_per_call():
+    calc = CelestialCalculator(precision=Precision.LOW)
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+
+    calc.calculate_position(location, CelestialBody.MARS)
+    calc.calculate_position(location, CelestialBody.MARS, precision=Precision.HIGH)
+
+    assert calc.current_snapshot().precision == Precision.LOW
+    assert calc.current_snapshot(Precision.HIGH).precision == Precision.HIGH
+
+
+ISS_TLE = """ISS (ZARYA)
+1 25544U 98067A   24001.50000000  .00016717  00000-0  30219-3 0  9993
+2 25544  51.6416 208.5340 0001000  80.0000 280.1200 15.49815361432123
+"""
+
+
+def test_satellite_matches_skyfield(tmp_path):
+    from skyfield.api import EarthSatellite, wgs84
+
+    path = tmp_path / "stations.tle"
+    path.write_text(ISS_TLE)
+    calc = CelestialCalculator(tle_path=str(path))
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+
+    t = calc.ts.utc(2024, 1, 1, 12, 30)
+    update = calc.calculate_satellite_position(location, "SAT:25544", snapshot=calc.snapshot(t))
+    by_name = calc.calculate_satellite_position(location, "SAT:ISS (ZARYA)", snapshot=calc.snapshot(t))
+
+    lines = ISS_TLE.splitlines()
+    satellite = EarthSatellite(lines[1], lines[2], lines[0], calc.ts)
+    alt, az, distance = (satellite - wgs84.latlon(59.91, 10.75)).at(t).altaz()
+    assert abs(update.altitude - alt.degrees) < 0.01
+    assert abs(update.azimuth - az.degrees) < 0.01
+    assert abs(update.distance_km - distance.km) < 1.0
+    assert by_name.azimuth == update.azimuth
+    assert calc.calculate_satellite_position(location, "SAT:99999") is None
+
+
+def test_snapshot_feed_shares_producer_snapshots():
+    import tempfile
+    import threading
+    import time
+    from domain.snapshot_feed import SnapshotPublisher
+
+    path = os.path.join(tempfile.mkdtemp(), "feed.sock")
+    producer = CelestialCalculator()
+    publisher = SnapshotPublisher(producer, path, interval=0.05)
+    threading.Thread(target=publisher.serve_forever, daemon=True).start()
+
+    worker = CelestialCalculator(snapshot_feed=path, snapshot_interval=60.0)
+    deadline = time.monotonic() + 5
+    while worker.feed.received == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert worker.feed.received > 0
+
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+    shared = worker.current_snapshot()
+    local = worker.snapshot(shared.t)
+    assert shared is worker._shared[Precision.HIGH]
+    assert worker.current_snapshot(Precision.LOW).precision == Precision.LOW
+
+    update = worker.calculate_position(location, CelestialBody.MARS, snapshot=shared)
+    expected = worker.calculate_position(location, CelestialBody.MARS, snapshot=local)
+    assert update.azimuth == pytest.approx(expected.azimuth, abs=1e-9)
+
+
+def test_calculate_rows_matches_snapshots(tmp_path):
+    path = tmp_path / "stations.tle"
+    path.write_text(ISS_TLE)
+    calc = CelestialCalculator(tle_path=str(path))
+    lats, lons, elevs = [59.91, -33.92, 35.0], [10.75, 18.42, -120.0], [0.0, 10.0, 1500.0]
+    t = calc.ts.utc(2024, 1, [1, 1, 2], [0, 12, 6], 30)
+
+    for target in (CelestialBody.MOON, "SAT:25544"):
+        alt, az, _ = calc.calculate_rows(lats, lons, elevs, target, t)
+        for i in range(3):
+            location = ObserverLocation(latitude=lats[i], longitude=lons[i], elevation=elevs[i])
+            snapshot = calc.snapshot(t[i])
+            if target == CelestialBody.MOON:
+                expected = calc.calculate_position(location, target, snapshot=snapshot)
+            else:
+                expected = calc.calculate_satellite_position(location, target, snapshot=snapshot)
+            assert alt[i] == pytest.approx(expected.altitude, abs=1e-3)
+            assert az[i] == pytest.approx(expected.azimuth, abs=1e-3)
+
+
+def test_calculate_many_matches_single_targets():
+    calc = CelestialCalculator(snapshot_interval=60.0)
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+    targets = [CelestialBody.SUN, CelestialBody.MOON, CelestialBody.SATURN, "SAT:25544"]
+
+    updates = calc.calculate_many(location, targets, now=1_750_000_000.0)
+
+    # No satellite catalogue: the SAT: target is dropped.
+    assert [u.target_id for u in updates] == ["SUN", "MOON", "SATURN"]
+    snapshot = calc.current_snapshot(now=1_750_000_000.0)
+    for update in updates:
+        single = calc.calculate_position(location, CelestialBody(update.target_id), snapshot=snapshot)
+        assert update.azimuth == pytest.approx(single.azimuth, abs=1e-9)
+        assert update.altitude == pytest.approx(single.altitude, abs=1e-9)
+        assert update.timestamp == single.timestamp
+
+def test_trajectories_serve_mixed_targets_without_full_snapshot(tmp_path):
+    path = tmp_path / "stations.tle"
+    path.write_text(ISS_TLE)
+    calc = CelestialCalculator(trajectory_window=600.0, tle_path=str(path))
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+    now = 1_704_112_200.0  # 2024-01-01 12:30 UTC, near the TLE epoch
+
+    updates = calc.calculate_many(location, [CelestialBody.MOON, "SAT:25544", "SAT:99999"], now=now)
+
+    # Satellites are propagated on their own; no ephemeris snapshot is built.
+    assert Precision.HIGH not in calc._snapshots
+    assert [u.target_id for u in updates] == ["MOON", "SAT:25544"]
+    snapshot = calc.snapshot(calc.ts.from_datetime(datetime.fromtimestamp(now, timezone.utc)))
+    moon = calc.calculate_position(location, CelestialBody.MOON, snapshot=snapshot)
+    satellite = calc.calculate_satellite_position(location, "SAT:25544", snapshot=snapshot)
+    assert updates[0].azimuth == pytest.approx(moon.azimuth, abs=1e-3)
+    assert updates[1].azimuth == pytest.approx(satellite.azimuth, abs=1e-9)
+    assert updates[1].azimuth_rate == pytest.approx(satellite.azimuth_rate, rel=1e-9)
+    assert updates[0].timestamp == updates[1].timestamp
+
+@pytest.mark.parametrize("precision", [Precision.HIGH, Precision.LOW])
+def test_angular_rates_match_finite_differences(precision):
+    calc = CelestialCalculator()
+    location = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+    now = 1_750_000_000.0
+
+    def at(offset):
+        t = calc.ts.from_datetime(datetime.fromtimestamp(now + offset, timezone.utc))
+        return calc.calculate_position(location, CelestialBody.MOON, snapshot=calc.snapshot(t, precision))
+
+    before, update, after = at(-5.0), at(0.0), at(5.0)
+    assert update.azimuth_rate == pytest.approx((after.azimuth - before.azimuth) / 10.0, rel=1e-4)
+    assert update.altitude_rate == pytest.approx((after.altitude - before.altitude) / 10.0, rel=1e-4)
+    assert update.altitude_accel == pytest.approx(
+        (after.altitude - 2 * update.altitude + before.altitude) / 25.0, rel=1e-2)
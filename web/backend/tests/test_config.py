@@ -0,0 +1,25 @@
+import os
+import sys
+
+# Add the backend root to path so the src package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config import Settings
+
+
+def test_empty_env_vars_disable_optional_settings_and_default_the_rest():
+    settings = Settings.from_env({
+        "OMNICOMPASS_PREWARM": "",
+        "OMNICOMPASS_EXECUTOR_WORKERS": "",
+        "OMNICOMPASS_INBOUND_RATE": "",
+        "OMNICOMPASS_EXECUTOR": "",
+        "OMNICOMPASS_TRAJECTORY_WINDOW": "",
+        "OMNICOMPASS_PUSH_ANGLE_DEG": "0.5",
+    })
+
+    assert settings.prewarm is True
+    assert settings.executor_workers == Settings().executor_workers
+    assert settings.inbound_rate == Settings().inbound_rate
+    assert settings.executor is None
+    assert settings.trajectory_window is None
+    assert settings.push_angle_deg == 0.5
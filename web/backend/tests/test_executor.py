@@ -0,0 +1,73 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the backend root to path so the api package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.executor import CalculationExecutor, ExecutorBusy
+from src.domain.calculator import CelestialCalculator
+from src.domain.models import CelestialBody, ObserverLocation
+
+OSLO = ObserverLocation(latitude=59.91, longitude=10.75, elevation=0)
+
+
+def test_thread_executor_matches_inline():
+    calc = CelestialCalculator()
+    executor = CalculationExecutor(calc, kind="thread", workers=2)
+    try:
+        snapshot_update = calc.calculate_position(OSLO, CelestialBody.MOON)
+        update = asyncio.run(executor.calculate_position(OSLO, CelestialBody.MOON))
+    finally:
+        executor.shutdown()
+
+    assert update.target_id == "MOON"
+    assert update.azimuth == pytest.approx(snapshot_update.azimuth, abs=0.01)
+
+
+def test_full_queue_rejects_instead_of_waiting():
+    calc = CelestialCalculator()
+    executor = CalculationExecutor(calc, kind="thread", workers=1, queue_depth=0)
+
+    async def submit_two():
+        return await asyncio.gather(
+            executor.calculate_position(OSLO, CelestialBody.SUN),
+            executor.calculate_position(OSLO, CelestialBody.MARS),
+            return_exceptions=True,
+        )
+
+    try:
+        first, second = asyncio.run(submit_two())
+    finally:
+        executor.shutdown()
+
+    assert first.target_id == "SUN"
+    assert isinstance(second, ExecutorBusy)
+    assert executor.rejected == 1
+    assert executor.in_flight == 0
+
+
+def test_only_accepted_calculations_are_timed():
+    from src.metrics import CALCULATION_SECONDS, EXECUTOR_QUEUE_SECONDS
+
+    calc = CelestialCalculator()
+    executor = CalculationExecutor(calc, kind="thread", workers=1, queue_depth=1)
+    calculations, waits = CALCULATION_SECONDS.count, EXECUTOR_QUEUE_SECONDS.count
+
+    async def submit_three():
+        bodies = (CelestialBody.SUN, CelestialBody.MARS, CelestialBody.MOON)
+        return await asyncio.gather(
+            *(executor.calculate_position(OSLO, body) for body in bodies),
+            return_exceptions=True,
+        )
+
+    try:
+        results = asyncio.run(submit_three())
+    finally:
+        executor.shutdown()
+
+    assert isinstance(results[2], ExecutorBusy)
+    assert CALCULATION_SECONDS.count - calculations == 2
+    assert EXECUTOR_QUEUE_SECONDS.count - waits == 2
@@ -0,0 +1,61 @@
+import math
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add the backend root to path so the domain package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.domain.flight_index import FlightIndex
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+def test_queries_match_brute_force():
+    rng = random.Random(7)
+    # Two clusters, one straddling the antimeridian, plus flights without a position.
+    flights = [
+        SimpleNamespace(latitude=59.9 + rng.uniform(-0.5, 0.5), longitude=10.7 + rng.uniform(-0.5, 0.5))
+        for _ in range(400)
+    ] + [
+        SimpleNamespace(latitude=rng.uniform(-0.3, 0.3), longitude=(180.0 + rng.uniform(-0.3, 0.3) + 180.0) % 360.0 - 180.0)
+        for _ in range(200)
+    ] + [SimpleNamespace(latitude=None, longitude=None)]
+    index = FlightIndex(flights)
+    assert len(index) == 600
+
+    observers = [(59.9, 10.7), (60.3, 11.1), (0.0, 179.95), (0.1, -179.9), (10.0, 10.0)]
+    lats, lons = zip(*observers)
+    within, within_distances = index.within(lats, lons, 15.0)
+    nearest, distances = index.nearest(lats, lons, 15.0, k=3)
+
+    for i, (lat, lon) in enumerate(observers):
+        expected = sorted(
+            (haversine_km(lat, lon, f.latitude, f.longitude), id(f))
+            for f in flights[:-1]
+            if haversine_km(lat, lon, f.latitude, f.longitude) <= 15.0
+        )
+        assert [id(index.flights[j]) for j in within[i]] == [key for _, key in expected]
+        assert np.allclose(within_distances[i], [d for d, _ in expected])
+
+        top = expected[:3]
+        assert [id(index.flights[j]) for j in nearest[i] if j >= 0] == [key for _, key in top]
+        assert np.allclose(distances[i, :len(top)], [d for d, _ in top])
+        assert np.all(np.isinf(distances[i, len(top):]))
+
+    assert nearest[4, 0] == -1
+
+
+def test_empty_index():
+    index = FlightIndex([])
+
+    assert index.within([59.9], [10.7], 15.0)[0][0].size == 0
+    found, distances = index.nearest(59.9, 10.7, 15.0)
+    assert found.tolist() == [[-1]] and np.isinf(distances[0, 0])
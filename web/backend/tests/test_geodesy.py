@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from skyfield.api import load, wgs84
+
+# Add the backend root to path so the domain package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.domain import geodesy
+
+OBSERVER = (59.9111, 10.7528, 50.0)
+AIRCRAFT = [(60.0836, 11.0547, 670.56), (59.80, 10.60, 11000.0), (59.95, 10.70, 3000.0), (59.9111, 10.7528, 9000.0)]
+
+
+def test_matches_skyfield_geometry():
+    ts = load.timescale()
+    t = ts.utc(2024, 6, 1, 12)
+    observer = wgs84.latlon(*OBSERVER)
+    lats, lons, alts = map(np.array, zip(*AIRCRAFT))
+
+    azimuth, elevation, distance_m = geodesy.azimuth_elevation_distance(*OBSERVER, lats, lons, alts)
+
+    for i, (lat, lon, alt) in enumerate(AIRCRAFT):
+        alt_sf, az_sf, distance_sf = (wgs84.latlon(lat, lon, alt) - observer).at(t).altaz()
+        assert elevation[i] == pytest.approx(alt_sf.degrees, abs=1e-6)
+        assert distance_m[i] == pytest.approx(distance_sf.m, abs=1e-3)
+        if elevation[i] < 89.9:
+            assert azimuth[i] == pytest.approx(az_sf.degrees, abs=1e-6)
+
+
+def test_broadcasts_observers_against_aircraft():
+    observers = np.array([OBSERVER, (51.5, -0.1, 20.0), (-33.9, 151.2, 0.0)])
+    lats, lons, alts = map(np.array, zip(*AIRCRAFT))
+
+    azimuth, elevation, distance_m = geodesy.azimuth_elevation_distance(
+        observers[:, :1], observers[:, 1:2], observers[:, 2:], lats, lons, alts,
+    )
+
+    assert azimuth.shape == elevation.shape == distance_m.shape == (3, len(AIRCRAFT))
+    for i, observer in enumerate(observers):
+        for j, aircraft in enumerate(AIRCRAFT):
+            expected = geodesy.azimuth_elevation_distance(*observer, *aircraft)
+            assert (azimuth[i, j], elevation[i, j], distance_m[i, j]) == pytest.approx(expected)
+
+
+def test_frame_rotations_and_great_circles_round_trip():
+    vectors = np.random.default_rng(3).normal(size=(3, 5))
+    lats, lons = np.linspace(-80, 80, 5), np.linspace(-170, 170, 5)
+    enu = geodesy.ecef_to_enu(vectors, lats, lons)
+    assert np.allclose(geodesy.enu_to_ecef(enu, lats, lons), vectors)
+    assert np.allclose(np.linalg.norm(enu, axis=0), np.linalg.norm(vectors, axis=0))
+
+    lat2, lon2 = geodesy.destination(lats, lons, 12.5, [0, 45, 90, 200, 315])
+    assert np.allclose(geodesy.great_circle_km(lats, lons, lat2, lon2), 12.5)
+    assert geodesy.destination(0.0, 179.99, 10.0, 90.0)[1] < -179.9
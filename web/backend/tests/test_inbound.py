@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import sys
+
+# Add the backend root to path so the api package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import WebSocketDisconnect
+
+from src.api.inbound import InboundLimiter, parse_message
+from src.api.websocket_handler import WebSocketHandler
+from src.domain.calculator import CelestialCalculator
+from src.domain.models import CelestialBody
+
+
+def test_fast_path_matches_json_path():
+    location = {"type": "UPDATE_LOCATION", "payload": {"latitude": 59.91, "longitude": -10.75, "elevation": 1e2}}
+    switch = {"type": "SWITCH_TARGET", "payload": {"target": "SAT:ISS (ZARYA)"}}
+
+    assert parse_message(json.dumps(location, separators=(",", ":"))) == ("UPDATE_LOCATION", (59.91, -10.75, 100.0))
+    # Reordered keys miss the fast path but decode the same way.
+    reordered = {"payload": {"longitude": -10.75, "latitude": 59.91, "elevation": 100}, "type": "UPDATE_LOCATION"}
+    assert parse_message(json.dumps(reordered)) == ("UPDATE_LOCATION", (59.91, -10.75, 100.0))
+    assert parse_message('{"type":"UPDATE_LOCATION","payload":{"latitude":1,"longitude":2}}') == (
+        "UPDATE_LOCATION", (1.0, 2.0, 0.0))
+
+    assert parse_message(json.dumps(switch)) == ("SWITCH_TARGET", {"target": "SAT:ISS (ZARYA)"})
+    assert parse_message(json.dumps({"type": "SWITCH_TARGET", "payload": {"target": "A\"B"}})) == (
+        "SWITCH_TARGET", {"target": 'A"B'})
+    assert parse_message('{"type":"SET_PRECISION","payload":{"precision":"LOW"}}') == (
+        "SET_PRECISION", {"precision": "LOW"})
+
+
+def test_limiter_drops_excess_and_gives_up_on_floods():
+    limiter = InboundLimiter(rate=10.0, burst=5.0, patience=2.0)
+
+    assert all(limiter.allow(0.0) for _ in range(5))
+    assert not limiter.allow(0.0)
+    assert limiter.allow(0.1)              # one token back after 0.1 s
+    assert not limiter.exhausted
+
+    # 40 messages a second: 10 pass, 30 are dropped, the budget drains at 20/s.
+    now = 0.1
+    while not limiter.exhausted and now < 5.0:
+        now += 0.025
+        limiter.allow(now)
+    assert limiter.exhausted
+    assert 0.9 < now < 1.2
+
+
+def test_target_switch_gets_through_a_location_flood():
+    class FakeWebSocket:
+        scope = {}
+
+        def __init__(self, messages):
+            self.messages = iter(messages)
+
+        async def accept(self, subprotocol=None):
+            pass
+
+        async def receive_text(self):
+            try:
+                return next(self.messages)
+            except StopIteration:
+                raise WebSocketDisconnect() from None
+
+        async def send_text(self, text):
+            pass
+
+        async def close(self, code=1000):
+            pass
+
+    location = '{"type":"UPDATE_LOCATION","payload":{"latitude":59.91,"longitude":10.75}}'
+    switch = '{"type":"SWITCH_TARGET","payload":{"target":"MOON"}}'
+    # Well past the location burst, though short of a disconnect.
+    messages = [location] * 150 + [switch] + [location] * 20
+
+    handler = WebSocketHandler(CelestialCalculator())
+    targets = []
+    update_subscription = handler.update_subscription
+
+    def record(websocket, state):
+        targets.append(state["target"])
+        update_subscription(websocket, state)
+
+    handler.update_subscription = record
+
+    async def run():
+        await handler.handle_connection(FakeWebSocket(messages))
+        handler.scheduler.stop()
+
+    asyncio.run(run())
+    assert handler.inbound_dropped > 0
+    assert targets[-1] == CelestialBody.MOON
@@ -0,0 +1,27 @@
+import os
+import sys
+
+# Add the backend root to path so the package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("work_seconds", "Time spent working.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+    registry.gauge("queue_depth", "Items waiting.", lambda: 7)
+    registry.counter("broken_total", "Owner is gone.", lambda: 1 / 0)
+
+    lines = registry.render().splitlines()
+
+    assert 'work_seconds_bucket{le="0.1"} 1' in lines
+    assert 'work_seconds_bucket{le="1.0"} 3' in lines
+    assert 'work_seconds_bucket{le="+Inf"} 4' in lines
+    assert "work_seconds_sum 4.25" in lines
+    assert "work_seconds_count 4" in lines
+    assert "# TYPE queue_depth gauge" in lines
+    assert "queue_depth 7.0" in lines
+    assert not any(line.startswith("broken_total") for line in lines)
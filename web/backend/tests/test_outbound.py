@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+
+# Add the backend root to path so the api package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.outbound import SLOW_CLIENT_CLOSE_CODE, Outbox
+
+
+class SlowWebSocket:
+    def __init__(self, delay):
+        self.delay = delay
+        self.sent = []
+        self.close_code = None
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+def test_newer_positions_replace_unsent_ones():
+    websocket = SlowWebSocket(delay=0.05)
+
+    async def scenario():
+        outbox = Outbox(websocket)
+        outbox.start()
+        outbox.push("a")
+        await asyncio.sleep(0.01)   # "a" is now being sent
+        outbox.push("b")
+        outbox.put("status")
+        outbox.push("c")
+        await asyncio.sleep(0.2)
+        outbox.close()
+        return outbox
+
+    outbox = asyncio.run(scenario())
+    assert websocket.sent == ["a", "status", "c"]
+    assert outbox.replaced == 1
+    assert outbox.sent == 3
+    assert outbox.max_latency_ms >= 50
+
+
+def test_stuck_client_is_disconnected():
+    websocket = SlowWebSocket(delay=10.0)
+
+    async def scenario():
+        outbox = Outbox(websocket, max_lag=0.05)
+        outbox.start()
+        outbox.push("a")
+        await asyncio.sleep(0.1)
+        outbox.push("b")
+        await asyncio.sleep(0)
+        return outbox
+
+    outbox = asyncio.run(scenario())
+    assert outbox.closed
+    assert websocket.close_code == SLOW_CLIENT_CLOSE_CODE
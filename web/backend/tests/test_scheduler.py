@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+
+# Add the backend root to path so the api package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.scheduler import TickScheduler
+
+
+def test_tick_shares_timestamp_and_skips_slow_callbacks():
+    scheduler = TickScheduler(interval=0.05)
+    seen = []
+    slow_started = []
+
+    async def fast(now):
+        seen.append(now)
+
+    async def slow(now):
+        slow_started.append(now)
+        await asyncio.sleep(0.2)
+
+    async def two_ticks():
+        scheduler._callbacks.update({"a": fast, "b": fast, "slow": slow})
+        await scheduler.tick(1000.0)
+        await scheduler.tick(1000.5)
+        scheduler.stop()
+
+    asyncio.run(two_ticks())
+
+    assert seen == [1000.0, 1000.0, 1000.5, 1000.5]
+    # Still running from the first tick, so not started again.
+    assert slow_started == [1000.0]
+    assert scheduler.skipped == 1
+    assert scheduler.overruns == 1
+    assert scheduler.ticks == 2
+
+
+def test_failing_prepare_does_not_stop_the_timer():
+    calls = []
+
+    def prepare(now):
+        calls.append(now)
+        raise ValueError("unknown target")
+
+    scheduler = TickScheduler(interval=0.01, prepare=prepare)
+    seen = []
+
+    async def push(now):
+        seen.append(now)
+
+    async def run_for_a_while():
+        scheduler._callbacks["a"] = push
+        # The tick still starts its callbacks.
+        await scheduler.tick(1000.0)
+        assert seen == [1000.0]
+
+        scheduler.add("a", push)
+        await asyncio.sleep(0.1)
+        running = scheduler._task is not None and not scheduler._task.done()
+        scheduler.stop()
+        return running
+
+    assert asyncio.run(run_for_a_while())
+    assert len(calls) >= 4 and scheduler.ticks >= 3
@@ -0,0 +1,106 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Add the backend root to path so the domain package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.domain.calculator import CelestialCalculator
+from src.domain.models import CelestialBody, ObserverLocation, Precision
+from src.domain.snapshot_feed import SnapshotPublisher, SnapshotSubscriber, decode_frame, encode_frame
+
+ISS_TLE = """ISS (ZARYA)
+1 25544U 98067A   24001.50000000  .00016717  00000-0  30219-3 0  9993
+2 25544  51.6416 208.5340 0001000  80.0000 280.1200 15.49815361432123
+"""
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_frame_round_trip_keeps_every_number(tmp_path):
+    path = tmp_path / "stations.tle"
+    path.write_text(ISS_TLE)
+    calc = CelestialCalculator(tle_path=str(path))
+    t = calc.ts.utc(2024, 1, 1, 12)
+    payload = {precision: calc.export_snapshot(calc.snapshot(t, precision)) for precision in Precision}
+
+    frame = encode_frame(payload)
+    decoded = decode_frame(bytearray(frame[4:]))
+
+    location = ObserverLocation(latitude=59.91, longitude=10.75)
+    for precision in Precision:
+        original, adopted = calc.snapshot(t, precision), calc.adopt_snapshot(decoded[precision])
+        assert adopted.t.tt == original.t.tt
+        for target in (CelestialBody.MOON, "SAT:25544"):
+            np.testing.assert_array_equal(adopted.position(target), original.position(target))
+            np.testing.assert_array_equal(adopted.motion(target)[1], original.motion(target)[1])
+        assert calc.calculate_satellite_position(location, "SAT:ISS (ZARYA)", snapshot=adopted) is not None
+
+    with pytest.raises(ValueError):
+        decode_frame(bytearray(frame[4:-8]))
+    with pytest.raises(ValueError):
+        decode_frame(bytearray(b"\x00\x00\x00\x02{}"))
+
+
+def test_stale_shared_snapshot_falls_back_to_local():
+    producer = CelestialCalculator()
+    worker = CelestialCalculator(snapshot_interval=0.5)
+    shared = worker.adopt_snapshot(producer.export_snapshot(producer.snapshot()))
+    assert worker.current_snapshot() is shared
+
+    # Nothing new for longer than two intervals: the producer is presumed gone.
+    shared.created -= 2 * worker.snapshot_interval
+    assert worker.current_snapshot() is not shared
+    assert worker.current_snapshot().precision == Precision.HIGH
+
+
+def test_subscriber_reconnects_to_restarted_publisher(tmp_path):
+    path = str(tmp_path / "feed.sock")
+    producer = CelestialCalculator()
+    worker = CelestialCalculator(snapshot_interval=60.0)
+    subscriber = SnapshotSubscriber(worker, path, reconnect_delay=0.05)
+    subscriber.start()
+
+    first = SnapshotPublisher(producer, path, interval=0.05)
+    threading.Thread(target=first.serve_forever, daemon=True).start()
+    assert wait_for(lambda: subscriber.received > 0)
+    assert oct(os.stat(path).st_mode & 0o777) == oct(0o600)
+
+    first.stop()
+    assert wait_for(lambda: not subscriber.connected)
+    received = subscriber.received
+
+    second = SnapshotPublisher(producer, path, interval=0.05)
+    threading.Thread(target=second.serve_forever, daemon=True).start()
+    assert wait_for(lambda: subscriber.received > received)
+    second.stop()
+
+
+def test_subscriber_drops_garbage_and_reconnects(tmp_path):
+    path = str(tmp_path / "feed.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    server.settimeout(5.0)
+    subscriber = SnapshotSubscriber(CelestialCalculator(), path, reconnect_delay=0.05)
+    subscriber.start()
+
+    connections = []
+    for _ in range(2):
+        connection, _ = server.accept()
+        connections.append(connection)
+        connection.sendall(b"\x00\x00\x00\x05\x80\x04N.x")  # not a frame: a pickle
+    assert subscriber.received == 0
+    for connection in connections:
+        connection.close()
+    server.close()
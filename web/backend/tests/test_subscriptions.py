@@ -0,0 +1,174 @@
+import asyncio
+import os
+import sys
+import time
+
+# Add the backend root to path so the api package can use its relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.api.executor import ExecutorBusy
+from src.api.subscriptions import SubscriptionRegistry
+from src.domain.calculator import CelestialCalculator
+from src.domain.models import CelestialBody, ObserverLocation, Precision
+
+
+class FakeOutbox:
+    def __init__(self):
+        self.sent = []
+
+    def push(self, frame):
+        self.sent.append(frame)
+
+
+def test_group_computes_once_and_broadcasts_same_text():
+    calc = CelestialCalculator()
+    calls = []
+
+    async def compute(location, target, precision, now):
+        calls.append((location, target))
+        return calc.calculate_position(location, target, precision=precision, now=now)
+
+    registry = SubscriptionRegistry(compute, precision_m=100.0)
+    crowd = [FakeOutbox() for _ in range(3)]
+    elsewhere = FakeOutbox()
+
+    async def run_tick():
+        for i, websocket in enumerate(crowd):
+            # A few metres apart: the same 100 m cell.
+            location = ObserverLocation(latitude=59.91 + i * 1e-5, longitude=10.75)
+            registry.subscribe(websocket, location, CelestialBody.MOON, Precision.HIGH)
+        registry.subscribe(elsewhere, ObserverLocation(latitude=-33.92, longitude=18.42),
+                           CelestialBody.MOON, Precision.HIGH)
+        await registry.tick(time.time())
+
+    asyncio.run(run_tick())
+
+    assert len(registry) == 2
+    assert len(calls) == 2
+    assert crowd[0].sent == crowd[1].sent == crowd[2].sent
+    assert len(crowd[0].sent) == 1
+    assert elsewhere.sent != crowd[0].sent
+
+    for websocket in crowd:
+        registry.unsubscribe(websocket)
+    assert len(registry) == 1
+    assert registry.connections == 1
+
+
+def test_send_policy_suppresses_small_changes_until_keyframe():
+    from datetime import datetime, timezone
+    from src.api.send_policy import ChangeThresholds
+    from src.domain.models import Direction
+
+    thresholds = ChangeThresholds(angle_deg=0.01, distance_fraction=1e-4, keyframe_interval=5.0)
+    policy = thresholds.policy()
+
+    def update(azimuth, altitude=30.0, distance_km=1.4e9):
+        return Direction(target_id="SATURN", azimuth=azimuth, altitude=altitude,
+                         distance_km=distance_km, timestamp=datetime.now(timezone.utc))
+
+    assert policy.should_send(update(359.999), 0.0)
+    assert not policy.should_send(update(0.004), 0.5)        # across the 360 wrap
+    assert not policy.should_send(update(359.999, distance_km=1.40001e9), 1.0)
+    assert policy.should_send(update(0.02), 1.5)
+    assert not policy.should_send(update(0.021), 2.0)
+    assert policy.should_send(update(0.021), 6.5)             # keyframe
+    assert (thresholds.sent, thresholds.suppressed) == (3, 3)
+
+
+def test_binary_frame_round_trip():
+    from datetime import datetime, timezone
+    from src.api.wire import POSITION_FRAME, decode_position, encode_position, target_code
+    from src.domain.models import Direction
+
+    timestamp = datetime(2025, 12, 23, 12, 0, 0, 250000, tzinfo=timezone.utc)
+    update = Direction(target_id="MOON", azimuth=145.32, altitude=45.12,
+                       distance_km=384400.5, timestamp=timestamp)
+    frame = encode_position(update, target_code("MOON"))
+    decoded = decode_position(frame)
+
+    assert len(frame) == POSITION_FRAME.size == 30
+    assert decoded["target_id"] == "MOON"
+    assert abs(decoded["azimuth"] - 145.32) < 1e-4
+    assert decoded["distance_km"] == 384400.5
+    assert decoded["timestamp_ms"] == round(timestamp.timestamp() * 1000)
+    assert target_code("AIRCRAFT_OVERHEAD") is None
+
+
+def test_json_frame_omits_empty_fields_and_matches_model():
+    import json
+    from datetime import datetime, timezone
+    from src.api.wire import encode_json
+    from src.domain.models import Direction
+
+    update = Direction(target_id="MOON", azimuth=145.32, altitude=45.12, distance_km=384400.5,
+                       timestamp=datetime(2025, 12, 23, 12, tzinfo=timezone.utc))
+    message = json.loads(encode_json(update))
+
+    assert message["type"] == "POSITION_UPDATE"
+    assert "aircraft_altitude_m" not in message["payload"]
+    model = update.to_model().model_dump(mode='json')
+    assert {k: v for k, v in model.items() if v is not None} == message["payload"]
+
+
+def test_extrapolating_policy_only_sends_when_prediction_drifts():
+    from datetime import datetime, timezone
+    from src.api.send_policy import ChangeThresholds
+    from src.domain.models import Direction
+
+    thresholds = ChangeThresholds(angle_deg=0.01, keyframe_interval=5.0)
+    policy = thresholds.policy()
+    policy.extrapolate(30.0)
+
+    def update(azimuth, altitude=30.0):
+        return Direction(target_id="MOON", azimuth=azimuth, altitude=altitude, distance_km=384000.0,
+                         timestamp=datetime.now(timezone.utc)).set_rates((0.004, 0.0, 0.0, 0.0))
+
+    assert policy.should_send(update(100.0), 0.0)
+    assert not policy.should_send(update(100.04), 10.0)    # on the extrapolated path
+    assert not policy.should_send(update(100.08), 20.0)    # past the default keyframe interval
+    assert policy.should_send(update(100.2), 25.0)         # drifted 0.1 degrees off it
+    assert policy.should_send(update(100.32), 55.0)        # keyframe
+
+
+def test_groups_beyond_executor_capacity_are_all_served():
+    calc = CelestialCalculator()
+    capacity = 10
+    in_flight = 0
+
+    async def compute(location, target, precision, now):
+        # Stands in for CalculationExecutor: refuses work past its capacity.
+        nonlocal in_flight
+        if in_flight >= capacity:
+            raise ExecutorBusy(f"{in_flight} calculations in flight")
+        in_flight += 1
+        try:
+            await asyncio.sleep(0.001)
+            return calc.calculate_position(location, target, precision=precision, now=now)
+        finally:
+            in_flight -= 1
+
+    def subscribe_all(registry):
+        outboxes = [FakeOutbox() for _ in range(35)]
+        for i, outbox in enumerate(outboxes):
+            location = ObserverLocation(latitude=-60.0 + i, longitude=10.75)
+            registry.subscribe(outbox, location, CelestialBody.MOON, Precision.LOW)
+        return outboxes
+
+    async def run_ticks(registry, ticks):
+        for _ in range(ticks):
+            await registry.tick(time.time())
+
+    # Capped at the executor's capacity, one tick reaches every group.
+    capped = SubscriptionRegistry(compute, concurrency=capacity)
+    outboxes = subscribe_all(capped)
+    asyncio.run(run_ticks(capped, 1))
+    assert all(outbox.sent for outbox in outboxes)
+    assert capped.rejected == 0
+
+    # Uncapped, rejected groups go first next tick, so nobody is starved.
+    uncapped = SubscriptionRegistry(compute)
+    outboxes = subscribe_all(uncapped)
+    asyncio.run(run_ticks(uncapped, 4))
+    assert uncapped.rejected > 0
+    assert all(outbox.sent for outbox in outboxes)